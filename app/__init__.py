@@ -4,8 +4,10 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 
+from .replicas import RoutingSession
 
-db = SQLAlchemy()
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 
 
@@ -15,8 +17,31 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///attendance.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=6)
+    app.config['PDF_EXPORT_WORKERS'] = int(os.environ.get('PDF_EXPORT_WORKERS', 0))
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 0))
+    app.config['PDF_IMPORT_WORKERS'] = int(os.environ.get('PDF_IMPORT_WORKERS', 0))
+    app.config['IMPORT_CHUNK_SIZE'] = int(os.environ.get('IMPORT_CHUNK_SIZE', 1000))
+    app.config['USER_CACHE_SIZE'] = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    app.config['USER_CACHE_TTL'] = int(os.environ.get('USER_CACHE_TTL', 300))
+    app.config['DASHBOARD_STATS_TTL'] = int(os.environ.get('DASHBOARD_STATS_TTL', 30))
+    app.config['DATABASE_PROFILE'] = os.environ.get('DATABASE_PROFILE', 'auto')
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    app.config['SQLITE_MMAP_SIZE'] = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 10))
+    app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    app.config['DB_STATEMENT_TIMEOUT_MS'] = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    app.config['REPLICA_DATABASE_URL'] = os.environ.get('REPLICA_DATABASE_URL')
+    app.config['REPLICA_PIN_SECONDS'] = int(os.environ.get('REPLICA_PIN_SECONDS', 15))
+    app.config['REPLICA_HEALTH_TTL'] = int(os.environ.get('REPLICA_HEALTH_TTL', 10))
+
+    from .engine_profiles import configure_engine, install_connect_hooks
+    from .replicas import init_replica_routing
 
+    configure_engine(app)
+    init_replica_routing(app)
     db.init_app(app)
+    with app.app_context():
+        install_connect_hooks(app, db.engines.values())
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
 
@@ -32,8 +57,17 @@ def create_app():
     app.register_blueprint(teacher_bp)
     app.register_blueprint(student_bp)
 
+    from .cli import register_commands
+
+    register_commands(app)
+
     with app.app_context():
         from . import models  # noqa: F401
+        from .utils.counters import create_counter_table
+        from .utils.search import create_search_tables
+
+        create_counter_table()
         db.create_all()
+        create_search_tables()
 
     return app
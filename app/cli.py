@@ -0,0 +1,105 @@
+"""``flask`` komut satırı için bakım komutları."""
+import click
+from flask.cli import with_appcontext
+
+from . import db
+from .utils.counters import rebuild_counters, verify_counters
+from .utils.rollups import rebuild_rollups, refresh_rollups
+from .utils.schema import ensure_indexes, hot_queries, table_scans
+from .utils.search import rebuild_search_index
+
+
+def register_commands(app):
+    app.cli.add_command(rebuild_counters_command)
+    app.cli.add_command(verify_counters_command)
+    app.cli.add_command(create_indexes_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(refresh_rollups_command)
+    app.cli.add_command(rebuild_rollups_command)
+
+
+@click.command('rebuild-counters')
+@with_appcontext
+def rebuild_counters_command():
+    """Devamsızlık sayaçlarını ham yoklama kayıtlarından yeniden oluşturur."""
+    row_count = rebuild_counters()
+    mismatches = verify_counters()
+    if mismatches:
+        db.session.rollback()
+        raise click.ClickException(f'Sayaçlar doğrulanamadı: {len(mismatches)} uyuşmazlık bulundu.')
+    db.session.commit()
+    click.echo(f'{row_count} sayaç satırı yeniden oluşturuldu ve doğrulandı.')
+
+
+@click.command('verify-counters')
+@with_appcontext
+def verify_counters_command():
+    """Devamsızlık sayaçlarını ham yoklama kayıtlarıyla karşılaştırır."""
+    mismatches = verify_counters()
+    for mismatch in mismatches:
+        click.echo(
+            f"Öğrenci {mismatch['student_id']} / Ders {mismatch['course_id']}: "
+            f"beklenen {mismatch['expected']}, kayıtlı {mismatch['actual']}"
+        )
+    if mismatches:
+        raise click.ClickException(f'{len(mismatches)} uyuşmazlık bulundu.')
+    click.echo('Sayaçlar ham kayıtlarla tutarlı.')
+
+
+@click.command('create-indexes')
+@with_appcontext
+def create_indexes_command():
+    """Mevcut veritabanına modellerde tanımlı olup eksik olan indeksleri ekler."""
+    created = ensure_indexes()
+    for name in created:
+        click.echo(f'Oluşturuldu: {name}')
+    click.echo(f'{len(created)} indeks oluşturuldu.' if created else 'Tüm indeksler zaten mevcut.')
+
+
+@click.command('check-query-plans')
+@with_appcontext
+def check_query_plans_command():
+    """Sık kullanılan sorguların tablo taramasına düşmediğini EXPLAIN ile doğrular."""
+    failures = 0
+    for name, statement in hot_queries().items():
+        try:
+            scans = table_scans(statement)
+        except NotImplementedError as exc:
+            raise click.ClickException(str(exc)) from exc
+        if scans:
+            failures += 1
+            click.echo(f"{name}: tablo taraması ({', '.join(scans)})")
+        else:
+            click.echo(f'{name}: indeks kullanılıyor')
+    if failures:
+        raise click.ClickException(f'{failures} sorgu tablo taraması yapıyor.')
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Öğrenci, kullanıcı ve ders arama indeksini baştan oluşturur."""
+    count = rebuild_search_index()
+    click.echo(f'{count} arama kaydı yeniden oluşturuldu.')
+
+
+@click.command('refresh-rollups')
+@with_appcontext
+def refresh_rollups_command():
+    """Günlük yoklama özetlerini son yenilemeden bu yana değişen günler için günceller."""
+    day_count = refresh_rollups()
+    db.session.commit()
+    if day_count < 0:
+        click.echo('Önceki yenileme bulunamadı; özet tablosu baştan oluşturuldu.')
+    else:
+        click.echo(f'{day_count} günün özeti güncellendi.')
+
+
+@click.command('rebuild-rollups')
+@with_appcontext
+def rebuild_rollups_command():
+    """Günlük yoklama özetlerini ham yoklama kayıtlarından baştan oluşturur."""
+    row_count = rebuild_rollups()
+    db.session.commit()
+    click.echo(f'{row_count} özet satırı yeniden oluşturuldu.')
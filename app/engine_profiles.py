@@ -0,0 +1,66 @@
+"""Named SQLAlchemy engine profiles, selected with the ``DATABASE_PROFILE`` setting.
+
+``auto`` picks the profile matching the database URI; ``none`` keeps the
+SQLAlchemy defaults.
+"""
+from functools import partial
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+PROFILES = ('sqlite', 'postgresql', 'none')
+
+
+def resolve_profile(name, database_uri):
+    if name and name != 'auto':
+        if name not in PROFILES:
+            raise ValueError(f"Bilinmeyen veritabanı profili: {name} (seçenekler: auto, {', '.join(PROFILES)})")
+        return name
+    backend = make_url(database_uri).get_backend_name()
+    return backend if backend in PROFILES else 'none'
+
+
+def configure_engine(app):
+    """Fill ``SQLALCHEMY_ENGINE_OPTIONS`` for the selected profile; call before ``db.init_app``.
+
+    Options already present in the config take precedence.
+    """
+    profile = resolve_profile(app.config['DATABASE_PROFILE'], app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['DATABASE_PROFILE'] = profile
+    options = _postgresql_options(app.config) if profile == 'postgresql' else {}
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def install_connect_hooks(app, engines):
+    """Register per-connection setup for the profile on every engine of the app."""
+    if app.config['DATABASE_PROFILE'] != 'sqlite':
+        return
+    for engine in engines:
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', partial(_apply_sqlite_pragmas, app.config))
+
+
+def _postgresql_options(config):
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+        'connect_args': {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"},
+    }
+
+
+def _apply_sqlite_pragmas(config, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers run alongside the single writer, and busy_timeout
+        # makes concurrent writers wait instead of failing with "database is locked".
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+        cursor.execute(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}")
+        cursor.execute('PRAGMA foreign_keys=ON')
+    finally:
+        cursor.close()
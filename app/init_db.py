@@ -5,12 +5,15 @@ from werkzeug.security import generate_password_hash
 
 from . import create_app, db
 from .models import User
+from .utils.schema import ensure_indexes
 
 
 def main():
     app = create_app()
     with app.app_context():
         db.create_all()
+        for name in ensure_indexes():
+            print(f'İndeks oluşturuldu: {name}')
         if User.query.filter_by(role='supervisor').first():
             print('Zaten en az bir yönetici mevcut.')
             return
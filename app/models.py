@@ -1,9 +1,16 @@
+import os
 from datetime import datetime
+
+from flask import current_app
 from flask_login import UserMixin
-from sqlalchemy import func, Column, Integer, String, ForeignKey, DateTime, Enum, UniqueConstraint, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import case, func, select, Column, Integer, String, ForeignKey, Date, DateTime, Enum, Index, UniqueConstraint, Text
+from sqlalchemy.orm import joinedload, relationship, selectinload
 
 from . import db, login_manager
+from .utils.cache import FileGeneration, TTLCache
+
+
+ATTENDANCE_STATUSES = ('present', 'excused', 'absent')
 
 
 class TimestampMixin:
@@ -11,7 +18,18 @@ class TimestampMixin:
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
-class User(UserMixin, TimestampMixin, db.Model):
+class RoleMixin:
+    def is_supervisor(self):
+        return self.role == 'supervisor'
+
+    def is_teacher(self):
+        return self.role == 'teacher'
+
+    def is_student(self):
+        return self.role == 'student'
+
+
+class User(RoleMixin, UserMixin, TimestampMixin, db.Model):
     __tablename__ = 'users'
 
     id = Column(Integer, primary_key=True)
@@ -26,19 +44,62 @@ class User(UserMixin, TimestampMixin, db.Model):
     student_profile = relationship('Student', uselist=False, back_populates='user')
     attendance_records = relationship('AttendanceRecord', back_populates='teacher')
 
-    def is_supervisor(self):
-        return self.role == 'supervisor'
 
-    def is_teacher(self):
-        return self.role == 'teacher'
+class SessionUser(RoleMixin, UserMixin):
+    """Detached snapshot of a :class:`User` served by the cached user loader.
 
-    def is_student(self):
-        return self.role == 'student'
+    It carries only plain columns; code that needs relationships must query
+    them by ``current_user.id``.
+    """
+
+    __slots__ = ('id', 'full_name', 'email', 'role', 'color')
+
+    def __init__(self, id, full_name, email, role, color):
+        self.id = id
+        self.full_name = full_name
+        self.email = email
+        self.role = role
+        self.color = color
+
+
+USER_CACHE_GENERATION_FILE = 'users.generation'
+
+
+def _user_cache():
+    cache = current_app.extensions.get('user_cache')
+    if cache is None:
+        generation = FileGeneration(os.path.join(current_app.instance_path, USER_CACHE_GENERATION_FILE))
+        cache = current_app.extensions.setdefault(
+            'user_cache',
+            TTLCache(current_app.config['USER_CACHE_SIZE'], current_app.config['USER_CACHE_TTL'], generation),
+        )
+    return cache
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+    cache = _user_cache()
+    user = cache.get(user_id)
+    if user is None:
+        row = db.session.execute(
+            select(User.id, User.full_name, User.email, User.role, User.color).where(User.id == user_id)
+        ).first()
+        if row is None:
+            return None
+        user = SessionUser(*row)
+        cache.set(user_id, user)
+    return user
+
+
+def invalidate_cached_user(user_id):
+    """Evict ``user_id`` here and, via the generation file, in every other process.
+
+    Call after the change is committed.
+    """
+    cache = _user_cache()
+    cache.pop(user_id)
+    cache.generation.bump()
 
 
 class ClassRoom(TimestampMixin, db.Model):
@@ -76,12 +137,13 @@ class Student(TimestampMixin, db.Model):
     full_name = Column(String(120), nullable=False)
     student_number = Column(String(50), unique=True, nullable=False)
     user_id = Column(Integer, ForeignKey('users.id'), unique=True, nullable=True)
-    classroom_id = Column(Integer, ForeignKey('classrooms.id'), nullable=False)
+    classroom_id = Column(Integer, ForeignKey('classrooms.id'), nullable=False, index=True)
 
     classroom = relationship('ClassRoom', back_populates='students')
     courses = relationship('Course', secondary='student_courses', back_populates='students')
     user = relationship('User', back_populates='student_profile')
-    attendance_entries = relationship('AttendanceEntry', back_populates='student')
+    attendance_entries = relationship('AttendanceEntry', back_populates='student', cascade='all, delete')
+    attendance_counters = relationship('AttendanceCounter', back_populates='student', cascade='all, delete')
 
 
 class CourseClass(db.Model):
@@ -93,19 +155,19 @@ class CourseClass(db.Model):
 class CourseTeacher(db.Model):
     __tablename__ = 'course_teachers'
     course_id = Column(Integer, ForeignKey('courses.id'), primary_key=True)
-    teacher_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    teacher_id = Column(Integer, ForeignKey('users.id'), primary_key=True, index=True)
 
 
 class ClassTeacher(db.Model):
     __tablename__ = 'class_teachers'
     classroom_id = Column(Integer, ForeignKey('classrooms.id'), primary_key=True)
-    teacher_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    teacher_id = Column(Integer, ForeignKey('users.id'), primary_key=True, index=True)
 
 
 class StudentCourse(db.Model):
     __tablename__ = 'student_courses'
     student_id = Column(Integer, ForeignKey('students.id'), primary_key=True)
-    course_id = Column(Integer, ForeignKey('courses.id'), primary_key=True)
+    course_id = Column(Integer, ForeignKey('courses.id'), primary_key=True, index=True)
     __table_args__ = (UniqueConstraint('student_id', 'course_id', name='uq_student_course'),)
 
 
@@ -123,6 +185,18 @@ class AttendanceRecord(TimestampMixin, db.Model):
     teacher = relationship('User', back_populates='attendance_records')
     entries = relationship('AttendanceEntry', back_populates='record', cascade='all, delete')
 
+    __table_args__ = (
+        # Newest-first listings (dashboards, overview, keyset pages).
+        Index('ix_attendance_records_session_date', 'session_date', 'id'),
+        # Teacher dashboard and history.
+        Index('ix_attendance_records_teacher_date', 'teacher_id', 'session_date', 'id'),
+        # Overview filters by course or classroom with a date range.
+        Index('ix_attendance_records_course_date', 'course_id', 'session_date'),
+        Index('ix_attendance_records_classroom_date', 'classroom_id', 'session_date'),
+        # Incremental rollup refresh.
+        Index('ix_attendance_records_updated_at', 'updated_at'),
+    )
+
 
 class AttendanceEntry(TimestampMixin, db.Model):
     __tablename__ = 'attendance_entries'
@@ -130,60 +204,171 @@ class AttendanceEntry(TimestampMixin, db.Model):
     id = Column(Integer, primary_key=True)
     record_id = Column(Integer, ForeignKey('attendance_records.id'), nullable=False)
     student_id = Column(Integer, ForeignKey('students.id'), nullable=False)
-    status = Column(Enum('present', 'excused', 'absent', name='attendance_status'), default='present', nullable=False)
+    status = Column(Enum(*ATTENDANCE_STATUSES, name='attendance_status'), default='present', nullable=False)
 
     record = relationship('AttendanceRecord', back_populates='entries')
     student = relationship('Student', back_populates='attendance_entries')
 
-    __table_args__ = (UniqueConstraint('record_id', 'student_id', name='uq_record_student'),)
+    __table_args__ = (
+        UniqueConstraint('record_id', 'student_id', name='uq_record_student'),
+        # Per-student statistics.
+        Index('ix_attendance_entries_student_status', 'student_id', 'status'),
+        # Incremental rollup refresh.
+        Index('ix_attendance_entries_updated_at', 'updated_at'),
+    )
 
 
-def attendance_statistics_for_student(student: Student):
-    total_by_course = {}
-    for course in student.courses:
-        total_sessions = (
-            AttendanceEntry.query.join(AttendanceRecord)
-            .filter(
-                AttendanceRecord.course_id == course.id,
-                AttendanceEntry.student_id == student.id,
-            )
-            .count()
-        )
-        if total_sessions == 0:
-            total_by_course[course.id] = {
-                'course': course,
-                'present': 0,
-                'excused': 0,
-                'absent': 0,
-                'total': 0,
-            }
-            continue
-
-        excused = (
-            AttendanceEntry.query.join(AttendanceRecord)
-            .filter(
-                AttendanceRecord.course_id == course.id,
-                AttendanceEntry.student_id == student.id,
-                AttendanceEntry.status == 'excused',
-            )
-            .count()
-        )
-        absent = (
-            AttendanceEntry.query.join(AttendanceRecord)
-            .filter(
-                AttendanceRecord.course_id == course.id,
-                AttendanceEntry.student_id == student.id,
-                AttendanceEntry.status == 'absent',
-            )
-            .count()
-        )
-        present = total_sessions - excused - absent
+class AttendanceSyncKey(db.Model):
+    """Client-generated idempotency key of an offline-synced attendance session."""
 
-        total_by_course[course.id] = {
-            'course': course,
-            'present': present,
+    __tablename__ = 'attendance_sync_keys'
+
+    teacher_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    key = Column(String(64), primary_key=True)
+    record_id = Column(Integer, ForeignKey('attendance_records.id'), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AttendanceCounter(db.Model):
+    """Denormalized per (student, course) attendance totals.
+
+    Kept in sync with ``attendance_entries`` by :mod:`app.utils.counters` in the
+    same transaction as the entry writes.
+    """
+
+    __tablename__ = 'attendance_counters'
+
+    student_id = Column(Integer, ForeignKey('students.id'), primary_key=True)
+    course_id = Column(Integer, ForeignKey('courses.id'), primary_key=True)
+    present = Column(Integer, default=0, nullable=False)
+    excused = Column(Integer, default=0, nullable=False)
+    absent = Column(Integer, default=0, nullable=False)
+    total = Column(Integer, default=0, nullable=False)
+
+    student = relationship('Student', back_populates='attendance_counters')
+    course = relationship('Course')
+
+
+class AttendanceDailyRollup(db.Model):
+    """Per-day attendance totals by course, classroom and teacher.
+
+    Derived from the raw records by :mod:`app.utils.rollups`; trend views
+    read only this table.
+    """
+
+    __tablename__ = 'attendance_daily_rollups'
+
+    day = Column(Date, primary_key=True)
+    course_id = Column(Integer, ForeignKey('courses.id'), primary_key=True)
+    classroom_id = Column(Integer, ForeignKey('classrooms.id'), primary_key=True)
+    teacher_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    sessions = Column(Integer, default=0, nullable=False)
+    present = Column(Integer, default=0, nullable=False)
+    excused = Column(Integer, default=0, nullable=False)
+    absent = Column(Integer, default=0, nullable=False)
+    total = Column(Integer, default=0, nullable=False)
+
+
+class RollupWatermark(db.Model):
+    """Raw rows updated after ``refreshed_until`` are not yet reflected in the rollup."""
+
+    __tablename__ = 'rollup_watermarks'
+
+    name = Column(String(50), primary_key=True)
+    refreshed_until = Column(DateTime, nullable=False)
+
+
+_RECORD_HEADER_OPTIONS = (
+    joinedload(AttendanceRecord.course),
+    joinedload(AttendanceRecord.classroom),
+    joinedload(AttendanceRecord.teacher),
+)
+
+# Named eager-loading profiles for ``AttendanceRecord`` queries. ``list`` covers
+# tables that only show the record header; ``export`` and ``edit`` also load
+# every entry together with its student, in one extra SELECT each.
+ATTENDANCE_RECORD_LOAD_PROFILES = {
+    'list': _RECORD_HEADER_OPTIONS,
+    'export': _RECORD_HEADER_OPTIONS
+    + (selectinload(AttendanceRecord.entries).joinedload(AttendanceEntry.student),),
+    'edit': _RECORD_HEADER_OPTIONS
+    + (selectinload(AttendanceRecord.entries).joinedload(AttendanceEntry.student),),
+}
+
+
+def attendance_record_options(profile: str):
+    """Return the loader options of a profile in ``ATTENDANCE_RECORD_LOAD_PROFILES``."""
+    return ATTENDANCE_RECORD_LOAD_PROFILES[profile]
+
+
+def _empty_statistics():
+    return {'present': 0, 'excused': 0, 'absent': 0, 'total': 0}
+
+
+def _attendance_counts_query(student_ids=None, course_ids=None):
+    """Grouped per (student, course) counts using conditional aggregation."""
+    query = (
+        db.session.query(
+            AttendanceEntry.student_id.label('student_id'),
+            AttendanceRecord.course_id.label('course_id'),
+            func.count(AttendanceEntry.id).label('total'),
+            func.sum(case((AttendanceEntry.status == 'excused', 1), else_=0)).label('excused'),
+            func.sum(case((AttendanceEntry.status == 'absent', 1), else_=0)).label('absent'),
+        )
+        .join(AttendanceRecord, AttendanceEntry.record_id == AttendanceRecord.id)
+        .group_by(AttendanceEntry.student_id, AttendanceRecord.course_id)
+    )
+    if student_ids is not None:
+        query = query.filter(AttendanceEntry.student_id.in_(list(student_ids)))
+    if course_ids is not None:
+        query = query.filter(AttendanceRecord.course_id.in_(list(course_ids)))
+    return query
+
+
+def attendance_statistics(student_ids=None, course_ids=None):
+    """Return ``{(student_id, course_id): counts}`` for the given students and courses.
+
+    All pairs are computed with a single grouped query. Pairs without any
+    attendance entry are omitted; callers should fall back to zero counts.
+    """
+    statistics = {}
+    for row in _attendance_counts_query(student_ids, course_ids):
+        excused = int(row.excused or 0)
+        absent = int(row.absent or 0)
+        statistics[(row.student_id, row.course_id)] = {
+            'present': row.total - excused - absent,
             'excused': excused,
             'absent': absent,
-            'total': total_sessions,
+            'total': row.total,
         }
+    return statistics
+
+
+def attendance_counters_for_student(student: Student):
+    """Return ``{course_id: {'course': Course, present, excused, absent, total}}`` for every enrolment.
+
+    Counts are read from ``attendance_counters``; enrolments without a roll
+    call report zeros.
+    """
+    rows = (
+        db.session.query(Course, AttendanceCounter)
+        .join(StudentCourse, StudentCourse.course_id == Course.id)
+        .outerjoin(
+            AttendanceCounter,
+            (AttendanceCounter.course_id == Course.id) & (AttendanceCounter.student_id == student.id),
+        )
+        .filter(StudentCourse.student_id == student.id)
+    )
+
+    total_by_course = {}
+    for course, counter in rows:
+        data = _empty_statistics()
+        if counter:
+            data.update(
+                present=counter.present,
+                excused=counter.excused,
+                absent=counter.absent,
+                total=counter.total,
+            )
+        total_by_course[course.id] = {'course': course, **data}
     return total_by_course
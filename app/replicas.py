@@ -0,0 +1,99 @@
+"""Route read-only requests to a read replica configured with ``REPLICA_DATABASE_URL``.
+
+Views marked with :func:`read_only` (or blueprints passed to
+:func:`read_only_blueprint`) send their SELECT statements to the
+``replica`` bind; writes and flushes always use the primary. Requests
+fall back to the primary when no replica is configured, when the
+replica fails its (cached) health check, or for a few seconds after the
+same browser session made a successful write so users see their own
+changes.
+"""
+import logging
+import time
+from functools import wraps
+
+from flask import current_app, g, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from .utils.cache import TTLCache
+
+
+REPLICA_BIND = 'replica'
+_PIN_SESSION_KEY = 'db_primary_until'
+_WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and g
+            and g.get('use_replica_db')
+            and getattr(clause, 'is_select', False)
+        ):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def init_replica_routing(app):
+    """Configure the replica bind and the read-your-writes hook; call before ``db.init_app``."""
+    if app.config['REPLICA_DATABASE_URL']:
+        app.config.setdefault('SQLALCHEMY_BINDS', {})[REPLICA_BIND] = app.config['REPLICA_DATABASE_URL']
+    app.after_request(_pin_after_write)
+
+
+def read_only(view):
+    """Run the view's SELECT statements against the replica when it is safe to."""
+
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        _route_to_replica()
+        return view(*args, **kwargs)
+
+    return wrapped
+
+
+def read_only_blueprint(blueprint):
+    """Mark every GET request of ``blueprint`` as read-only."""
+    blueprint.before_request(lambda: _route_to_replica() if request.method == 'GET' else None)
+    return blueprint
+
+
+def replica_available():
+    """Return whether the replica answers; the result is cached for ``REPLICA_HEALTH_TTL`` seconds."""
+    if not current_app.config['REPLICA_DATABASE_URL']:
+        return False
+    cache = current_app.extensions.get('replica_health')
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            'replica_health', TTLCache(maxsize=1, ttl=current_app.config['REPLICA_HEALTH_TTL'])
+        )
+    healthy = cache.get('healthy')
+    if healthy is None:
+        engine = current_app.extensions['sqlalchemy'].engines[REPLICA_BIND]
+        try:
+            with engine.connect() as connection:
+                # Touch a real table: SQLite happily opens (and creates) an empty file.
+                connection.execute(text('SELECT 1 FROM users LIMIT 1'))
+            healthy = True
+        except SQLAlchemyError:
+            logger.warning('Okuma kopyasına ulaşılamadı; sorgular birincil veritabanına yönlendiriliyor.', exc_info=True)
+            healthy = False
+        cache.set('healthy', healthy)
+    return healthy
+
+
+def _route_to_replica():
+    pinned = session.get(_PIN_SESSION_KEY, 0) > time.time()
+    g.use_replica_db = not pinned and replica_available()
+
+
+def _pin_after_write(response):
+    if request.method in _WRITE_METHODS and response.status_code < 400:
+        session[_PIN_SESSION_KEY] = time.time() + current_app.config['REPLICA_PIN_SECONDS']
+    return response
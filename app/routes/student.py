@@ -3,7 +3,7 @@ from flask_login import current_user
 from werkzeug.security import generate_password_hash
 
 from .. import db
-from ..models import Student, attendance_statistics_for_student
+from ..models import Student, attendance_counters_for_student, invalidate_cached_user
 from ..utils.decorators import role_required
 
 
@@ -14,7 +14,7 @@ student_bp = Blueprint('student', __name__, url_prefix='/ogrenci')
 @role_required('student')
 def dashboard():
     student = Student.query.filter_by(user_id=current_user.id).first_or_404()
-    raw_stats = attendance_statistics_for_student(student)
+    raw_stats = attendance_counters_for_student(student)
     stats = []
     for data in raw_stats.values():
         total = data['total'] or 0
@@ -58,6 +58,7 @@ def change_password():
         else:
             student.user.password_hash = generate_password_hash(new_password)
             db.session.commit()
+            invalidate_cached_user(current_user.id)
             flash('Şifreniz başarıyla güncellendi.', 'success')
             return redirect(url_for('student.change_password'))
 
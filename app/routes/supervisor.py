@@ -1,17 +1,21 @@
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
 from flask import (
     Blueprint,
+    Response,
+    current_app,
     flash,
     redirect,
     render_template,
     request,
     send_file,
     session,
+    stream_with_context,
     url_for,
 )
-from sqlalchemy import or_
+from sqlalchemy import exists, func, insert, select
 from werkzeug.security import generate_password_hash
 
 from .. import db
@@ -20,36 +24,87 @@ from ..models import (
     AttendanceRecord,
     ClassRoom,
     Course,
+    CourseClass,
     Student,
+    StudentCourse,
     User,
+    attendance_record_options,
+    invalidate_cached_user,
 )
-from ..utils.accounts import generate_student_credentials
+from ..replicas import read_only
+from ..utils.accounts import (
+    StudentEmailAllocator,
+    generate_student_credentials,
+    hash_passwords,
+    password_hash_pool,
+)
+from ..utils.cache import TTLCache
+from ..utils.counters import apply_deltas, new_deltas, track_status_change
 from ..utils.decorators import role_required
-from ..utils.exporters import generate_csv, generate_pdf
-from ..utils.importers import parse_csv, parse_pdf, parse_excel
+from ..utils.exporters import generate_breach_csv, generate_pdf, iter_csv as iter_export_csv
+from ..utils.import_store import (
+    append_credentials,
+    iter_credentials,
+    new_id,
+    pop_report,
+    read_credentials,
+    save_report,
+)
+from ..utils.importers import iter_csv, iter_excel, parse_pdf, validate_students
+from ..utils.pagination import decode_cursor, keyset_page
+from ..utils.permissions import invalidate_teacher_authorizations
+from ..utils.reports import TREND_GROUPS, TREND_PERIODS, absence_breaches, attendance_trends, default_trend_range
+from ..utils.rollups import rollups_refreshed_until
+from ..utils.search import reindex, search_ids
 
 
 supervisor_bp = Blueprint('supervisor', __name__, url_prefix='/supervisor')
 
+ATTENDANCE_PAGE_SIZE = 50
+CSV_EXPORT_BATCH_SIZE = 500
+ABSENCE_REPORT_ROW_LIMIT = 500
+# Rows of skipped lines and generated credentials shown on the students page.
+IMPORT_REPORT_ROW_LIMIT = 200
+
 
 @supervisor_bp.route('/panel')
 @role_required('supervisor')
+@read_only
 def dashboard():
-    stats = {
-        'teacher_count': User.query.filter_by(role='teacher').count(),
-        'student_count': Student.query.count(),
-        'course_count': Course.query.count(),
-        'class_count': ClassRoom.query.count(),
-        'attendance_count': AttendanceRecord.query.count(),
-    }
+    stats = _dashboard_stats()
     latest_records = (
-        AttendanceRecord.query.order_by(AttendanceRecord.session_date.desc())
+        AttendanceRecord.query.options(*attendance_record_options('list'))
+        .order_by(AttendanceRecord.session_date.desc())
         .limit(5)
         .all()
     )
     return render_template('supervisor/dashboard.html', stats=stats, latest_records=latest_records)
 
 
+def _dashboard_stats():
+    """Entity counts for the dashboard, computed in one round trip and cached briefly."""
+    cache = current_app.extensions.get('dashboard_stats')
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            'dashboard_stats', TTLCache(maxsize=1, ttl=current_app.config['DASHBOARD_STATS_TTL'])
+        )
+    stats = cache.get('stats')
+    if stats is None:
+        counts = {
+            'teacher_count': select(func.count(User.id)).where(User.role == 'teacher'),
+            'student_count': select(func.count(Student.id)),
+            'course_count': select(func.count(Course.id)),
+            'class_count': select(func.count(ClassRoom.id)),
+            'attendance_count': select(func.count(AttendanceRecord.id)),
+        }
+        row = db.session.execute(
+            select(*(query.scalar_subquery().label(name) for name, query in counts.items()))
+        ).one()
+        stats = dict(row._mapping)
+        cache.set('stats', stats)
+    return stats
+
+
 # ------------------ TEACHERS ------------------ #
 @supervisor_bp.route('/ogretmenler')
 @role_required('supervisor')
@@ -57,8 +112,7 @@ def teachers():
     query = request.args.get('q', '').strip()
     teachers = User.query.filter_by(role='teacher')
     if query:
-        like_query = f"%{query}%"
-        teachers = teachers.filter(or_(User.full_name.ilike(like_query), User.email.ilike(like_query)))
+        teachers = teachers.filter(User.id.in_(search_ids(User, query)))
     teachers = teachers.order_by(User.full_name).all()
     courses = Course.query.order_by(Course.name).all()
     classes = ClassRoom.query.order_by(ClassRoom.name).all()
@@ -88,6 +142,7 @@ def add_teacher():
 
     db.session.add(teacher)
     db.session.commit()
+    invalidate_teacher_authorizations()
     flash('Öğretmen başarıyla eklendi.', 'success')
     return redirect(url_for('supervisor.teachers'))
 
@@ -110,6 +165,8 @@ def edit_teacher(teacher_id):
     teacher.teacher_classes = ClassRoom.query.filter(ClassRoom.id.in_(class_ids)).all()
 
     db.session.commit()
+    invalidate_teacher_authorizations()
+    invalidate_cached_user(teacher.id)
     flash('Öğretmen bilgileri güncellendi.', 'success')
     return redirect(url_for('supervisor.teachers'))
 
@@ -120,6 +177,8 @@ def delete_teacher(teacher_id):
     teacher = User.query.get_or_404(teacher_id)
     db.session.delete(teacher)
     db.session.commit()
+    invalidate_teacher_authorizations()
+    invalidate_cached_user(teacher_id)
     flash('Öğretmen silindi.', 'info')
     return redirect(url_for('supervisor.teachers'))
 
@@ -161,6 +220,7 @@ def add_course():
 
     db.session.add(course)
     db.session.commit()
+    invalidate_teacher_authorizations()
     flash('Ders eklendi.', 'success')
     return redirect(url_for('supervisor.courses_view'))
 
@@ -181,6 +241,7 @@ def edit_course(course_id):
     course.teachers = User.query.filter(User.id.in_(teacher_ids)).all()
 
     db.session.commit()
+    invalidate_teacher_authorizations()
     flash('Ders bilgileri güncellendi.', 'success')
     return redirect(url_for('supervisor.courses_view'))
 
@@ -191,6 +252,7 @@ def delete_course(course_id):
     course = Course.query.get_or_404(course_id)
     db.session.delete(course)
     db.session.commit()
+    invalidate_teacher_authorizations()
     flash('Ders silindi.', 'info')
     return redirect(url_for('supervisor.courses_view'))
 
@@ -223,6 +285,7 @@ def add_class():
 
     db.session.add(classroom)
     db.session.commit()
+    invalidate_teacher_authorizations()
     flash('Sınıf oluşturuldu.', 'success')
     return redirect(url_for('supervisor.classes_view'))
 
@@ -240,6 +303,7 @@ def edit_class(class_id):
     classroom.teachers = User.query.filter(User.id.in_(teacher_ids)).all()
 
     db.session.commit()
+    invalidate_teacher_authorizations()
     flash('Sınıf bilgileri güncellendi.', 'success')
     return redirect(url_for('supervisor.classes_view'))
 
@@ -250,6 +314,7 @@ def delete_class(class_id):
     classroom = ClassRoom.query.get_or_404(class_id)
     db.session.delete(classroom)
     db.session.commit()
+    invalidate_teacher_authorizations()
     flash('Sınıf silindi.', 'info')
     return redirect(url_for('supervisor.classes_view'))
 
@@ -270,8 +335,10 @@ def students_view():
         students_query = students_query.join(Student.courses).filter(Course.id == course_filter)
 
     students = students_query.order_by(Student.full_name).all()
-    generated_credentials = session.get('new_student_credentials', [])
-    import_report = session.pop('last_import_report', None)
+    generated_credentials, generated_credentials_total = read_credentials(
+        session.get('generated_credentials_id'), IMPORT_REPORT_ROW_LIMIT
+    )
+    import_report = pop_report(session.pop('import_report_id', None))
 
     return render_template(
         'supervisor/students.html',
@@ -281,7 +348,9 @@ def students_view():
         class_filter=class_filter,
         course_filter=course_filter,
         generated_credentials=generated_credentials,
+        generated_credentials_total=generated_credentials_total,
         import_report=import_report,
+        row_limit=IMPORT_REPORT_ROW_LIMIT,
     )
 
 
@@ -312,6 +381,7 @@ def add_student():
         return redirect(url_for('supervisor.students_view'))
 
     user = None
+    existing_user = None
     if email:
         existing_user = User.query.filter_by(email=email).first()
         if existing_user:
@@ -334,6 +404,8 @@ def add_student():
     student.courses = Course.query.filter(Course.id.in_(course_ids)).all()
     db.session.add(student)
     db.session.commit()
+    if existing_user:
+        invalidate_cached_user(existing_user.id)
 
     if email_generated or password_generated:
         _store_generated_credentials(
@@ -410,6 +482,8 @@ def edit_student(student_id):
         )
 
     db.session.commit()
+    if student.user_id:
+        invalidate_cached_user(student.user_id)
     flash('Öğrenci güncellendi.', 'success')
     return redirect(url_for('supervisor.students_view'))
 
@@ -417,18 +491,27 @@ def edit_student(student_id):
 @supervisor_bp.route('/ogrenciler/yeni-kimlik-bilgileri.csv')
 @role_required('supervisor')
 def download_generated_credentials():
-    credentials = session.get('new_student_credentials', [])
-    if not credentials:
+    credentials_id = session.get('generated_credentials_id')
+    if next(iter_credentials(credentials_id), None) is None:
         flash('İndirilecek yeni kimlik bilgisi bulunmuyor.', 'info')
         return redirect(url_for('supervisor.students_view'))
 
+    filename = f"ogrenci_kimlikleri_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
+    return Response(
+        stream_with_context(_iter_credentials_csv(credentials_id)),
+        mimetype='text/csv; charset=utf-8',
+        headers={'Content-Disposition': f'attachment; filename={filename}'},
+    )
+
+
+def _iter_credentials_csv(credentials_id):
     import csv
     import io
 
     output = io.StringIO()
     writer = csv.writer(output)
     writer.writerow(['Ad Soyad', 'Okul No', 'E-posta', 'Şifre', 'E-posta Otomatik', 'Şifre Otomatik'])
-    for item in credentials:
+    for item in iter_credentials(credentials_id):
         writer.writerow(
             [
                 item.get('full_name', ''),
@@ -439,15 +522,11 @@ def download_generated_credentials():
                 'Evet' if item.get('auto_password') else 'Hayır',
             ]
         )
-
-    output.seek(0)
-    filename = f"ogrenci_kimlikleri_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-    return send_file(
-        io.BytesIO(output.getvalue().encode('utf-8')),
-        as_attachment=True,
-        download_name=filename,
-        mimetype='text/csv; charset=utf-8',
-    )
+        if output.tell() > 64 * 1024:
+            yield output.getvalue().encode('utf-8')
+            output.seek(0)
+            output.truncate()
+    yield output.getvalue().encode('utf-8')
 
 
 def _store_generated_credentials(
@@ -458,18 +537,25 @@ def _store_generated_credentials(
     auto_email: bool,
     auto_password: bool,
 ) -> None:
-    credentials = session.get('new_student_credentials', [])
-    credentials.append(
-        {
-            'full_name': full_name,
-            'student_number': student_number,
-            'email': email,
-            'password': password,
-            'auto_email': auto_email,
-            'auto_password': auto_password,
-        }
+    append_credentials(
+        _generated_credentials_id(),
+        [
+            {
+                'full_name': full_name,
+                'student_number': student_number,
+                'email': email,
+                'password': password,
+                'auto_email': auto_email,
+                'auto_password': auto_password,
+            }
+        ],
     )
-    session['new_student_credentials'] = credentials
+
+
+def _generated_credentials_id() -> str:
+    if 'generated_credentials_id' not in session:
+        session['generated_credentials_id'] = new_id()
+    return session['generated_credentials_id']
 
 
 @supervisor_bp.route('/ogrenciler/<int:student_id>/sil', methods=['POST'])
@@ -490,24 +576,31 @@ def import_students():
         flash('Lütfen bir dosya seçin.', 'warning')
         return redirect(url_for('supervisor.students_view'))
 
+    start_row = request.form.get('start_row', type=int) or 0
     try:
         source_label, students_data = _parse_student_file(file)
-        if not students_data:
+        result = _import_students_in_chunks(
+            students_data,
+            chunk_size=current_app.config['IMPORT_CHUNK_SIZE'],
+            start_row=start_row,
+            credentials_id=_generated_credentials_id(),
+        )
+        if not result['total']:
             raise ValueError('Dosyada aktarılabilir öğrenci verisi bulunamadı.')
-        result = _bulk_create_students(students_data)
     except Exception as exc:  # noqa: BLE001
         flash(str(exc), 'danger')
         return redirect(url_for('supervisor.students_view'))
 
-    for credential in result['credentials']:
-        _store_generated_credentials(**credential)
-
-    session['last_import_report'] = {
-        'source': source_label,
-        'total': len(students_data),
-        'created': result['created'],
-        'skipped_rows': result['skipped_rows'],
-    }
+    session['import_report_id'] = save_report(
+        {
+            'source': source_label,
+            'total': result['total'],
+            'created': result['created'],
+            'skipped_rows': result['skipped_rows'],
+            'chunks': result['chunks'],
+            'failure': result['failure'],
+        }
+    )
 
     if result['created']:
         flash(
@@ -519,35 +612,140 @@ def import_students():
             f"{len(result['skipped_rows'])} satır atlandı. Ayrıntılar sonuç panelinde listelendi.",
             'warning',
         )
+    if result['failure']:
+        flash(
+            f"İçe aktarma {result['failure']['resume_row']}. satırda durdu. "
+            'Dosyayı bu başlangıç satırıyla yeniden yükleyerek devam edebilirsiniz.',
+            'danger',
+        )
+    return redirect(url_for('supervisor.students_view'))
+
+
+@supervisor_bp.route('/ogrenciler/iceri-aktar/on-izleme', methods=['POST'])
+@role_required('supervisor')
+def preview_student_import():
+    file = request.files.get('file')
+    if not file or not file.filename:
+        flash('Lütfen bir dosya seçin.', 'warning')
+        return redirect(url_for('supervisor.students_view'))
+
+    try:
+        source_label, students_data = _parse_student_file(file)
+        result = validate_students(
+            students_data,
+            existing_numbers=db.session.scalars(select(Student.student_number)),
+            existing_class_names=db.session.scalars(select(ClassRoom.name)),
+        )
+        if not result['total']:
+            raise ValueError('Dosyada aktarılabilir öğrenci verisi bulunamadı.')
+    except Exception as exc:  # noqa: BLE001
+        flash(str(exc), 'danger')
+        return redirect(url_for('supervisor.students_view'))
+
+    session['import_report_id'] = save_report({'source': source_label, 'dry_run': True, **result})
+    flash('Ön izleme tamamlandı. Hiçbir kayıt yapılmadı.', 'info')
     return redirect(url_for('supervisor.students_view'))
 
 
+def _import_students_in_chunks(students_data, chunk_size, credentials_id, start_row=0):
+    """Import ``students_data`` in committed chunks of ``chunk_size`` rows.
+
+    Rows before ``start_row`` are ignored so a failed import can be resumed
+    from the first row of the chunk that failed; every earlier chunk has
+    already been committed. Generated credentials are appended to the
+    server-side list ``credentials_id`` after each commit instead of being
+    collected in the result.
+    """
+    result = {
+        'total': 0,
+        'created': 0,
+        'skipped_rows': [],
+        'chunks': [],
+        'failure': None,
+    }
+    rows = (
+        row
+        for index, row in enumerate(students_data, start=2)
+        if row.setdefault('source_row', index) >= start_row
+    )
+    resume_row = start_row or 2
+    email_allocator = StudentEmailAllocator()
+
+    with password_hash_pool(current_app.config['PASSWORD_HASH_WORKERS']) as hash_executor:
+        while True:
+            try:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                chunk_result = _bulk_create_students(
+                    chunk, email_allocator=email_allocator, hash_executor=hash_executor
+                )
+            except Exception as exc:  # noqa: BLE001
+                db.session.rollback()
+                if not result['chunks']:
+                    raise
+                current_app.logger.exception('Öğrenci içe aktarma %s. satırda durdu.', resume_row)
+                result['failure'] = {'resume_row': resume_row, 'reason': str(exc)}
+                break
+
+            result['total'] += len(chunk)
+            result['created'] += chunk_result['created']
+            result['skipped_rows'].extend(chunk_result['skipped_rows'])
+            append_credentials(credentials_id, chunk_result['credentials'])
+            result['chunks'].append(
+                {
+                    'first_row': chunk[0]['source_row'],
+                    'last_row': chunk[-1]['source_row'],
+                    'created': chunk_result['created'],
+                    'skipped': len(chunk_result['skipped_rows']),
+                }
+            )
+            current_app.logger.info(
+                'Öğrenci içe aktarma: %s-%s. satırlar kaydedildi (%s yeni).',
+                chunk[0]['source_row'],
+                chunk[-1]['source_row'],
+                chunk_result['created'],
+            )
+            resume_row = chunk[-1]['source_row'] + 1
+
+    return result
+
+
 def _parse_student_file(file_storage):
     filename = (file_storage.filename or '').lower()
     extension = Path(filename).suffix
     mimetype = (file_storage.mimetype or '').lower()
 
     if extension == '.csv':
-        return 'CSV', parse_csv(file_storage)
+        return 'CSV', iter_csv(file_storage)
     if extension in {'.xls', '.xlsx'}:
-        return 'Excel', parse_excel(file_storage)
+        return 'Excel', iter_excel(file_storage)
     if extension == '.pdf':
-        return 'PDF', parse_pdf(file_storage)
+        return 'PDF', parse_pdf(file_storage, workers=current_app.config['PDF_IMPORT_WORKERS'])
 
     if 'pdf' in mimetype:
-        return 'PDF', parse_pdf(file_storage)
+        return 'PDF', parse_pdf(file_storage, workers=current_app.config['PDF_IMPORT_WORKERS'])
     if 'excel' in mimetype or 'spreadsheet' in mimetype:
-        return 'Excel', parse_excel(file_storage)
+        return 'Excel', iter_excel(file_storage)
     if 'csv' in mimetype or mimetype == 'text/plain':
-        return 'CSV', parse_csv(file_storage)
+        return 'CSV', iter_csv(file_storage)
 
     raise ValueError('Desteklenmeyen dosya türü. Lütfen CSV, Excel veya PDF yükleyin.')
 
 
-def _bulk_create_students(students_data):
-    created_count = 0
+def _bulk_create_students(students_data, email_allocator=None, hash_executor=None):
     skipped_rows = []
-    generated_credentials = []
+    pending = []
+
+    numbers = {student_info.get('student_number', '').strip() for student_info in students_data} - {''}
+    class_names = {student_info.get('class_name', '').strip() or 'Genel' for student_info in students_data}
+    taken_numbers = set(
+        db.session.scalars(select(Student.student_number).where(Student.student_number.in_(numbers)))
+    )
+    classroom_ids = dict(
+        db.session.execute(select(ClassRoom.name, ClassRoom.id).where(ClassRoom.name.in_(class_names))).all()
+    )
+    email_allocator = email_allocator or StudentEmailAllocator()
 
     for fallback_index, student_info in enumerate(students_data, start=2):
         row_number = student_info.get('source_row', fallback_index)
@@ -555,60 +753,112 @@ def _bulk_create_students(students_data):
         if not student_number:
             skipped_rows.append({'row': row_number, 'reason': 'Okul numarası eksik.'})
             continue
-
-        existing = Student.query.filter_by(student_number=student_number).first()
-        if existing:
+        if student_number in taken_numbers:
             skipped_rows.append({'row': row_number, 'reason': 'Okul numarası zaten kayıtlı.'})
             continue
+        taken_numbers.add(student_number)
 
+        full_name = student_info.get('full_name', '').strip() or 'İsimsiz Öğrenci'
         class_name = student_info.get('class_name', '').strip() or 'Genel'
-        classroom = ClassRoom.query.filter_by(name=class_name).first()
-        if not classroom:
-            classroom = ClassRoom(name=class_name)
-            db.session.add(classroom)
-            db.session.flush()
+        pending.append({'full_name': full_name, 'student_number': student_number, 'class_name': class_name})
 
-        full_name = student_info.get('full_name', '').strip() or 'İsimsiz Öğrenci'
-        email, password = generate_student_credentials(full_name, student_number)
-
-        user = User(full_name=full_name, email=email, role='student')
-        user.password_hash = generate_password_hash(password)
-        db.session.add(user)
-        db.session.flush()
-
-        student = Student(
-            full_name=full_name,
-            student_number=student_number,
-            classroom_id=classroom.id,
-            user_id=user.id,
+    if pending:
+        email_allocator.preload(
+            StudentEmailAllocator.base_local(item['full_name'], item['student_number']) for item in pending
         )
-        student.courses = list(classroom.courses)
-        db.session.add(student)
+        for item in pending:
+            item['email'], item['password'] = generate_student_credentials(
+                item['full_name'], item['student_number'], allocator=email_allocator
+            )
 
-        generated_credentials.append(
-            {
-                'full_name': full_name,
-                'student_number': student_number,
-                'email': email,
-                'password': password,
-                'auto_email': True,
-                'auto_password': True,
-            }
+        new_class_names = sorted({item['class_name'] for item in pending} - set(classroom_ids))
+        if new_class_names:
+            db.session.execute(insert(ClassRoom), [{'name': name} for name in new_class_names])
+            classroom_ids.update(
+                db.session.execute(
+                    select(ClassRoom.name, ClassRoom.id).where(ClassRoom.name.in_(new_class_names))
+                ).all()
+            )
+
+        course_ids_by_class = {}
+        for classroom_id, course_id in db.session.execute(
+            select(CourseClass.classroom_id, CourseClass.course_id).where(
+                CourseClass.classroom_id.in_({classroom_ids[item['class_name']] for item in pending})
+            )
+        ):
+            course_ids_by_class.setdefault(classroom_id, []).append(course_id)
+
+        password_hashes = hash_passwords([item['password'] for item in pending], executor=hash_executor)
+        # Only new accounts with unused emails are inserted, so no cached user goes stale.
+        db.session.execute(
+            insert(User),
+            [
+                {
+                    'full_name': item['full_name'],
+                    'email': item['email'],
+                    'role': 'student',
+                    'password_hash': password_hash,
+                }
+                for item, password_hash in zip(pending, password_hashes)
+            ],
         )
-        created_count += 1
+        user_ids = dict(
+            db.session.execute(
+                select(User.email, User.id).where(User.email.in_([item['email'] for item in pending]))
+            ).all()
+        )
+        db.session.execute(
+            insert(Student),
+            [
+                {
+                    'full_name': item['full_name'],
+                    'student_number': item['student_number'],
+                    'classroom_id': classroom_ids[item['class_name']],
+                    'user_id': user_ids[item['email']],
+                }
+                for item in pending
+            ],
+        )
+        student_ids = dict(
+            db.session.execute(
+                select(Student.student_number, Student.id).where(
+                    Student.student_number.in_([item['student_number'] for item in pending])
+                )
+            ).all()
+        )
+        enrolments = [
+            {'student_id': student_ids[item['student_number']], 'course_id': course_id}
+            for item in pending
+            for course_id in course_ids_by_class.get(classroom_ids[item['class_name']], [])
+        ]
+        if enrolments:
+            db.session.execute(insert(StudentCourse), enrolments)
+        reindex(User, user_ids.values())
+        reindex(Student, student_ids.values())
 
     db.session.commit()
 
     return {
-        'created': created_count,
+        'created': len(pending),
         'skipped_rows': skipped_rows,
-        'credentials': generated_credentials,
+        'credentials': [
+            {
+                'full_name': item['full_name'],
+                'student_number': item['student_number'],
+                'email': item['email'],
+                'password': item['password'],
+                'auto_email': True,
+                'auto_password': True,
+            }
+            for item in pending
+        ],
     }
 
 
 # ------------------ ATTENDANCE ------------------ #
 @supervisor_bp.route('/yoklamalar')
 @role_required('supervisor')
+@read_only
 def attendance_overview():
     classes = ClassRoom.query.order_by(ClassRoom.name).all()
     courses = Course.query.order_by(Course.name).all()
@@ -616,11 +866,22 @@ def attendance_overview():
     students = Student.query.order_by(Student.full_name).all()
 
     filters = _get_attendance_filter_values()
-    records = _query_attendance_records(filters, with_feedback=True).all()
+    cursor = decode_cursor(request.args.get('cursor'))
+    records, next_cursor = keyset_page(
+        _query_attendance_records(filters, with_feedback=True),
+        AttendanceRecord.session_date,
+        AttendanceRecord.id,
+        cursor,
+        ATTENDANCE_PAGE_SIZE,
+    )
+    page_args = {key: value for key, value in request.args.items() if key != 'cursor'}
 
     return render_template(
         'supervisor/attendance.html',
         records=records,
+        next_cursor=next_cursor,
+        is_first_page=cursor is None,
+        page_args=page_args,
         classes=classes,
         courses=courses,
         teachers=teachers,
@@ -639,12 +900,15 @@ def attendance_overview():
 @supervisor_bp.route('/yoklamalar/<int:record_id>/duzenle', methods=['GET', 'POST'])
 @role_required('supervisor')
 def edit_attendance(record_id):
-    record = AttendanceRecord.query.get_or_404(record_id)
+    record = AttendanceRecord.query.options(*attendance_record_options('edit')).get_or_404(record_id)
     if request.method == 'POST':
+        deltas = new_deltas()
         for entry in record.entries:
             status = request.form.get(f'status_{entry.id}')
             if status in {'present', 'excused', 'absent'}:
+                track_status_change(deltas, entry.student_id, record.course_id, entry.status, status)
                 entry.status = status
+        apply_deltas(deltas)
         db.session.commit()
         flash('Yoklama güncellendi.', 'success')
         return redirect(url_for('supervisor.attendance_overview'))
@@ -653,30 +917,106 @@ def edit_attendance(record_id):
 
 @supervisor_bp.route('/yoklamalar/indir/csv')
 @role_required('supervisor')
+@read_only
 def export_attendance_csv():
-    records = _filtered_records()
-    buffer = generate_csv(records)
+    filters = _get_attendance_filter_values()
+    records = _query_attendance_records(filters, profile='export').yield_per(CSV_EXPORT_BATCH_SIZE)
     filename = f"yoklamalar_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name=filename,
+    return Response(
+        stream_with_context(iter_export_csv(records)),
         mimetype='text/csv; charset=utf-8',
+        headers={'Content-Disposition': f'attachment; filename={filename}'},
+    )
+
+
+@supervisor_bp.route('/devamsizlik-raporu')
+@role_required('supervisor')
+@read_only
+def absence_report():
+    filters = _get_breach_filter_values()
+    breaches = absence_breaches(filters['class_filter'], filters['course_filter'])
+    return render_template(
+        'supervisor/absence_report.html',
+        breaches=breaches.head(ABSENCE_REPORT_ROW_LIMIT).to_dict('records'),
+        breach_count=len(breaches),
+        row_limit=ABSENCE_REPORT_ROW_LIMIT,
+        classes=ClassRoom.query.order_by(ClassRoom.name).all(),
+        courses=Course.query.order_by(Course.name).all(),
+        **filters,
+    )
+
+
+@supervisor_bp.route('/devamsizlik-raporu/indir/csv')
+@role_required('supervisor')
+@read_only
+def export_absence_report_csv():
+    filters = _get_breach_filter_values()
+    breaches = absence_breaches(filters['class_filter'], filters['course_filter'])
+    filename = f"devamsizlik_raporu_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
+    return Response(
+        generate_breach_csv(breaches),
+        mimetype='text/csv; charset=utf-8',
+        headers={'Content-Disposition': f'attachment; filename={filename}'},
+    )
+
+
+def _get_breach_filter_values():
+    return {
+        'class_filter': request.args.get('class_id', type=int),
+        'course_filter': request.args.get('course_id', type=int),
+    }
+
+
+@supervisor_bp.route('/trendler')
+@role_required('supervisor')
+@read_only
+def attendance_trends_view():
+    filters = _get_breach_filter_values()
+    group = request.args.get('group')
+    period = request.args.get('period')
+    group = group if group in TREND_GROUPS else 'classroom'
+    period = period if period in TREND_PERIODS else 'week'
+    default_from, default_to = default_trend_range(datetime.utcnow().date())
+    date_from = _trend_date(request.args.get('date_from'), default_from, 'Başlangıç tarihi geçersiz.')
+    date_to = _trend_date(request.args.get('date_to'), default_to, 'Bitiş tarihi geçersiz.')
+    trends = attendance_trends(group, period, date_from, date_to, filters['class_filter'], filters['course_filter'])
+    return render_template(
+        'supervisor/trends.html',
+        trends=trends,
+        group=group,
+        period=period,
+        date_from=date_from,
+        date_to=date_to,
+        refreshed_until=rollups_refreshed_until(),
+        classes=ClassRoom.query.order_by(ClassRoom.name).all(),
+        courses=Course.query.order_by(Course.name).all(),
+        **filters,
     )
 
 
+def _trend_date(value, default, message):
+    if not value:
+        return default
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        flash(message, 'warning')
+        return default
+
+
 @supervisor_bp.route('/yoklamalar/indir/pdf')
 @role_required('supervisor')
+@read_only
 def export_attendance_pdf():
     records = _filtered_records()
-    buffer = generate_pdf(records)
+    buffer = generate_pdf(records, workers=current_app.config['PDF_EXPORT_WORKERS'])
     filename = f"yoklamalar_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
     return send_file(buffer, as_attachment=True, download_name=filename, mimetype='application/pdf')
 
 
 def _filtered_records():
     filters = _get_attendance_filter_values()
-    return _query_attendance_records(filters).all()
+    return _query_attendance_records(filters, profile='export').all()
 
 
 def _get_attendance_filter_values():
@@ -692,8 +1032,8 @@ def _get_attendance_filter_values():
     }
 
 
-def _query_attendance_records(filters, with_feedback: bool = False):
-    records_query = AttendanceRecord.query
+def _query_attendance_records(filters, with_feedback: bool = False, profile: str = 'list'):
+    records_query = AttendanceRecord.query.options(*attendance_record_options(profile))
 
     if filters['class_filter']:
         records_query = records_query.filter_by(classroom_id=filters['class_filter'])
@@ -703,30 +1043,20 @@ def _query_attendance_records(filters, with_feedback: bool = False):
         records_query = records_query.filter_by(teacher_id=filters['teacher_filter'])
 
     if filters['course_query']:
-        like = f"%{filters['course_query']}%"
-        records_query = records_query.join(AttendanceRecord.course).filter(
-            or_(Course.name.ilike(like), Course.code.ilike(like))
+        records_query = records_query.filter(
+            AttendanceRecord.course_id.in_(search_ids(Course, filters['course_query']))
         )
     if filters['teacher_query']:
-        like = f"%{filters['teacher_query']}%"
-        records_query = records_query.join(AttendanceRecord.teacher).filter(
-            or_(User.full_name.ilike(like), User.email.ilike(like))
+        records_query = records_query.filter(
+            AttendanceRecord.teacher_id.in_(search_ids(User, filters['teacher_query']))
         )
-
-    needs_distinct = False
     if filters['student_query']:
-        like = f"%{filters['student_query']}%"
-        records_query = (
-            records_query.join(AttendanceRecord.entries)
-            .join(AttendanceEntry.student)
-            .filter(
-                or_(
-                    Student.full_name.ilike(like),
-                    Student.student_number.ilike(like),
-                )
+        records_query = records_query.filter(
+            exists().where(
+                AttendanceEntry.record_id == AttendanceRecord.id,
+                AttendanceEntry.student_id.in_(search_ids(Student, filters['student_query'])),
             )
         )
-        needs_distinct = True
 
     if filters['date_from']:
         try:
@@ -743,7 +1073,4 @@ def _query_attendance_records(filters, with_feedback: bool = False):
             if with_feedback:
                 flash('Bitiş tarihi geçersiz.', 'warning')
 
-    if needs_distinct:
-        records_query = records_query.distinct()
-
-    return records_query.order_by(AttendanceRecord.session_date.desc())
+    return records_query.order_by(AttendanceRecord.session_date.desc(), AttendanceRecord.id.desc())
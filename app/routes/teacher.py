@@ -1,22 +1,41 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-from flask import Blueprint, abort, flash, redirect, render_template, request, url_for
+from flask import Blueprint, abort, flash, jsonify, redirect, render_template, request, url_for
 from flask_login import current_user
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.exc import IntegrityError
 
 from .. import db
-from ..models import AttendanceEntry, AttendanceRecord, ClassRoom, Course, Student
+from ..models import (
+    ATTENDANCE_STATUSES,
+    AttendanceEntry,
+    AttendanceRecord,
+    AttendanceSyncKey,
+    ClassRoom,
+    Course,
+    Student,
+    attendance_record_options,
+)
+from ..utils.counters import apply_deltas, new_deltas, track_status, track_status_change
 from ..utils.decorators import role_required
+from ..utils.pagination import decode_cursor, keyset_page
+from ..utils.permissions import teacher_authorization_index
 
 
 teacher_bp = Blueprint('teacher', __name__, url_prefix='/teacher')
 
+EDIT_WINDOW = timedelta(minutes=30)
+HISTORY_PAGE_SIZE = 50
+SYNC_BATCH_LIMIT = 50
+
 
 @teacher_bp.route('/panel')
 @role_required('teacher')
 def dashboard():
     course_options = _teacher_course_options(current_user)
     recent_records = (
-        AttendanceRecord.query.filter_by(teacher_id=current_user.id)
+        AttendanceRecord.query.options(*attendance_record_options('list'))
+        .filter_by(teacher_id=current_user.id)
         .order_by(AttendanceRecord.session_date.desc())
         .limit(5)
         .all()
@@ -29,36 +48,34 @@ def dashboard():
 def create_attendance():
     course_id = request.args.get('course_id', type=int) or request.form.get('course_id', type=int)
     class_id = request.args.get('class_id', type=int) or request.form.get('class_id', type=int)
-    course = Course.query.get_or_404(course_id) if course_id else None
-    classroom = ClassRoom.query.get_or_404(class_id) if class_id else None
-    allowed_classes = []
-    if course:
-        allowed_classes = _teacher_allowed_classes(current_user, course)
-
     if request.method == 'POST':
-        if not course or not classroom:
+        if not course_id or not class_id:
             flash('Ders ve sınıf seçimi zorunludur.', 'danger')
             return redirect(url_for('teacher.dashboard'))
-        if classroom not in allowed_classes:
+        if not _teacher_can_use(current_user, course_id, class_id):
             flash('Bu sınıf için yetkiniz yok.', 'danger')
             return redirect(url_for('teacher.dashboard'))
 
-        record = AttendanceRecord(course_id=course.id, classroom_id=classroom.id, teacher_id=current_user.id)
-        db.session.add(record)
-        db.session.flush()
+        student_ids = db.session.scalars(select(Student.id).where(Student.classroom_id == class_id)).all()
+        statuses = {student_id: request.form.get(f'status_{student_id}', 'present') for student_id in student_ids}
+        if not set(statuses.values()) <= set(ATTENDANCE_STATUSES):
+            flash('Geçersiz yoklama durumu gönderildi.', 'danger')
+            return redirect(url_for('teacher.create_attendance', course_id=course_id, class_id=class_id))
 
-        for student in classroom.students:
-            status = request.form.get(f'status_{student.id}', 'present')
-            entry = AttendanceEntry(record_id=record.id, student_id=student.id, status=status)
-            db.session.add(entry)
+        _write_attendance(current_user.id, course_id, class_id, statuses)
         db.session.commit()
         flash('Yoklama kaydedildi.', 'success')
         return redirect(url_for('teacher.history'))
 
+    course = Course.query.get_or_404(course_id) if course_id else None
+    classroom = ClassRoom.query.get_or_404(class_id) if class_id else None
     course_options = _teacher_course_options(current_user)
+    allowed_classes = []
+    if course:
+        allowed_classes = next((option['classes'] for option in course_options if option['course'].id == course.id), [])
     students = []
     if course and classroom:
-        if classroom not in allowed_classes:
+        if not _teacher_can_use(current_user, course.id, classroom.id):
             flash('Bu sınıf için yetkiniz yok.', 'danger')
             return redirect(url_for('teacher.dashboard'))
         students = classroom.students
@@ -75,18 +92,21 @@ def create_attendance():
 @teacher_bp.route('/yoklama/<int:record_id>/duzenle', methods=['GET', 'POST'])
 @role_required('teacher')
 def edit_attendance(record_id):
-    record = AttendanceRecord.query.get_or_404(record_id)
+    record = AttendanceRecord.query.options(*attendance_record_options('edit')).get_or_404(record_id)
     if record.teacher_id != current_user.id:
         abort(403)
-    if datetime.utcnow() - record.created_at > timedelta(minutes=30):
+    if datetime.utcnow() - record.created_at > EDIT_WINDOW:
         flash('Bu yoklama için düzenleme süresi sona erdi.', 'warning')
         return redirect(url_for('teacher.history'))
 
     if request.method == 'POST':
+        deltas = new_deltas()
         for entry in record.entries:
             status = request.form.get(f'status_{entry.id}')
             if status in {'present', 'excused', 'absent'}:
+                track_status_change(deltas, entry.student_id, record.course_id, entry.status, status)
                 entry.status = status
+        apply_deltas(deltas)
         db.session.commit()
         flash('Yoklama güncellendi.', 'success')
         return redirect(url_for('teacher.history'))
@@ -97,34 +117,217 @@ def edit_attendance(record_id):
 @teacher_bp.route('/yoklama/gecmis')
 @role_required('teacher')
 def history():
-    records = (
-        AttendanceRecord.query.filter_by(teacher_id=current_user.id)
-        .order_by(AttendanceRecord.session_date.desc())
-        .all()
+    """One keyset page of the teacher's records with per-record status counts.
+
+    Counts and the edit window are evaluated in the grouped query, so no
+    entries are loaded.
+    """
+    edit_deadline = datetime.utcnow() - EDIT_WINDOW
+    query = (
+        db.session.query(
+            AttendanceRecord.id.label('id'),
+            AttendanceRecord.session_date.label('session_date'),
+            Course.name.label('course_name'),
+            ClassRoom.name.label('classroom_name'),
+            func.sum(case((AttendanceEntry.status == 'present', 1), else_=0)).label('present'),
+            func.sum(case((AttendanceEntry.status == 'excused', 1), else_=0)).label('excused'),
+            func.sum(case((AttendanceEntry.status == 'absent', 1), else_=0)).label('absent'),
+            (AttendanceRecord.created_at >= edit_deadline).label('editable'),
+        )
+        .join(Course, AttendanceRecord.course_id == Course.id)
+        .join(ClassRoom, AttendanceRecord.classroom_id == ClassRoom.id)
+        .outerjoin(AttendanceEntry, AttendanceEntry.record_id == AttendanceRecord.id)
+        .filter(AttendanceRecord.teacher_id == current_user.id)
+        .group_by(AttendanceRecord.id, Course.id, ClassRoom.id)
+        .order_by(AttendanceRecord.session_date.desc(), AttendanceRecord.id.desc())
+    )
+    cursor = decode_cursor(request.args.get('cursor'))
+    records, next_cursor = keyset_page(
+        query,
+        AttendanceRecord.session_date,
+        AttendanceRecord.id,
+        cursor,
+        HISTORY_PAGE_SIZE,
+    )
+    return render_template(
+        'teacher/history.html',
+        records=records,
+        next_cursor=next_cursor,
+        is_first_page=cursor is None,
+    )
+
+
+@teacher_bp.route('/api/yoklama/senkron', methods=['POST'])
+@role_required('teacher')
+def sync_attendance():
+    """Write a batch of offline roll calls in one transaction.
+
+    Every session carries a client-generated ``idempotency_key``; replays of
+    an already stored key are answered with the original record id instead
+    of being written again.
+    """
+    payload = request.get_json(silent=True) or {}
+    sessions = payload.get('sessions')
+    if not isinstance(sessions, list) or not sessions:
+        return jsonify({'error': 'sessions listesi zorunludur.'}), 400
+    if len(sessions) > SYNC_BATCH_LIMIT:
+        return jsonify({'error': f'Bir istekte en fazla {SYNC_BATCH_LIMIT} yoklama gönderilebilir.'}), 400
+
+    keys = {str(item.get('idempotency_key') or '') for item in sessions if isinstance(item, dict)} - {''}
+    known_keys = dict(
+        db.session.execute(
+            select(AttendanceSyncKey.key, AttendanceSyncKey.record_id).where(
+                AttendanceSyncKey.teacher_id == current_user.id,
+                AttendanceSyncKey.key.in_(keys),
+            )
+        ).all()
     )
-    now = datetime.utcnow()
-    records_with_status = [
+    authorizations = teacher_authorization_index(current_user.id)
+    class_ids = {item.get('class_id') for item in sessions if isinstance(item, dict) and _is_id(item.get('class_id'))}
+    students_by_class = {}
+    for student_id, classroom_id in db.session.execute(
+        select(Student.id, Student.classroom_id).where(Student.classroom_id.in_(class_ids))
+    ):
+        students_by_class.setdefault(classroom_id, []).append(student_id)
+
+    results = []
+    written = []
+    for item in sessions:
+        result, session_data = _validate_sync_session(item, known_keys, authorizations, students_by_class)
+        results.append(result)
+        if session_data:
+            known_keys[result['idempotency_key']] = None
+            written.append((result, session_data))
+
+    try:
+        for result, session_data in written:
+            record = _write_attendance(current_user.id, **session_data)
+            result['record_id'] = record.id
+            known_keys[result['idempotency_key']] = record.id
+        if written:
+            db.session.execute(
+                insert(AttendanceSyncKey),
+                [
+                    {'teacher_id': current_user.id, 'key': result['idempotency_key'], 'record_id': result['record_id']}
+                    for result, _ in written
+                ],
+            )
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Aynı yoklamalar eşzamanlı gönderildi. Lütfen tekrar deneyin.'}), 409
+
+    for result in results:
+        if result['status'] == 'duplicate' and result['record_id'] is None:
+            result['record_id'] = known_keys.get(result['idempotency_key'])
+    return jsonify({'results': results})
+
+
+def _validate_sync_session(item, known_keys, authorizations, students_by_class):
+    """Return the per-session result and, if it must be written, the write arguments."""
+    if not isinstance(item, dict):
+        return {'idempotency_key': None, 'status': 'error', 'record_id': None, 'error': 'Geçersiz yoklama.'}, None
+
+    key = str(item.get('idempotency_key') or '')
+    result = {'idempotency_key': key or None, 'status': 'error', 'record_id': None}
+    if not key or len(key) > 64:
+        result['error'] = 'idempotency_key zorunludur (en fazla 64 karakter).'
+        return result, None
+    if key in known_keys:
+        result.update(status='duplicate', record_id=known_keys[key])
+        return result, None
+
+    course_id = item.get('course_id')
+    classroom_id = item.get('class_id')
+    if not _is_id(course_id) or not _is_id(classroom_id):
+        result['error'] = 'course_id ve class_id tam sayı olmalıdır.'
+        return result, None
+    if classroom_id not in authorizations.get(course_id, ()):
+        result['error'] = 'Bu ders ve sınıf için yetkiniz yok.'
+        return result, None
+
+    submitted = item.get('statuses') or {}
+    if not isinstance(submitted, dict) or not all(isinstance(status, str) for status in submitted.values()):
+        result['error'] = 'statuses, öğrenci numaralarını durum metinlerine eşleyen bir nesne olmalıdır.'
+        return result, None
+    student_ids = students_by_class.get(classroom_id, [])
+    statuses = {student_id: submitted.get(str(student_id), 'present') for student_id in student_ids}
+    unknown_students = set(submitted) - {str(student_id) for student_id in student_ids}
+    if unknown_students or not set(statuses.values()) <= set(ATTENDANCE_STATUSES):
+        result['error'] = 'Geçersiz öğrenci veya yoklama durumu.'
+        return result, None
+
+    session_date = None
+    if item.get('session_date'):
+        try:
+            session_date = datetime.fromisoformat(str(item['session_date']))
+        except ValueError:
+            result['error'] = 'session_date ISO 8601 biçiminde olmalıdır.'
+            return result, None
+        if session_date.tzinfo:
+            session_date = session_date.astimezone(timezone.utc).replace(tzinfo=None)
+
+    result['status'] = 'created'
+    return result, {
+        'course_id': course_id,
+        'classroom_id': classroom_id,
+        'statuses': statuses,
+        'session_date': session_date,
+    }
+
+
+def _is_id(value):
+    # JSON true/false arrive as bool, which is a subclass of int.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _write_attendance(teacher_id, course_id, classroom_id, statuses, session_date=None):
+    """Insert a record and all of its entries; the caller commits.
+
+    ``statuses`` maps student ids to already validated statuses. Entries are
+    written with a single executemany INSERT and the attendance counters
+    are updated in the same transaction.
+    """
+    record = AttendanceRecord(course_id=course_id, classroom_id=classroom_id, teacher_id=teacher_id)
+    if session_date:
+        record.session_date = session_date
+    db.session.add(record)
+    db.session.flush()
+
+    if statuses:
+        db.session.execute(
+            insert(AttendanceEntry),
+            [
+                {'record_id': record.id, 'student_id': student_id, 'status': status}
+                for student_id, status in statuses.items()
+            ],
+        )
+    deltas = new_deltas()
+    for student_id, status in statuses.items():
+        track_status(deltas, student_id, course_id, status)
+    apply_deltas(deltas)
+    return record
+
+
+def _teacher_course_options(teacher):
+    index = teacher_authorization_index(teacher.id)
+    if not index:
+        return []
+    courses = Course.query.filter(Course.id.in_(index)).order_by(Course.id).all()
+    classroom_ids = set().union(*index.values())
+    classrooms = ClassRoom.query.filter(ClassRoom.id.in_(classroom_ids)).all() if classroom_ids else []
+    classrooms_by_id = {classroom.id: classroom for classroom in classrooms}
+    return [
         {
-            'record': record,
-            'editable': now - record.created_at <= timedelta(minutes=30),
+            'course': course,
+            'classes': sorted(
+                (classrooms_by_id[class_id] for class_id in index[course.id] if class_id in classrooms_by_id),
+                key=lambda c: c.name,
+            ),
         }
-        for record in records
+        for course in courses
     ]
-    return render_template('teacher/history.html', records=records_with_status)
 
 
-def _teacher_course_options(teacher):
-    options = []
-    for course in teacher.teacher_courses:
-        allowed_classes = _teacher_allowed_classes(teacher, course)
-        options.append({'course': course, 'classes': allowed_classes})
-    return options
-
-
-def _teacher_allowed_classes(teacher, course):
-    teacher_class_ids = {classroom.id for classroom in teacher.teacher_classes}
-    if teacher_class_ids:
-        allowed = [classroom for classroom in course.classrooms if classroom.id in teacher_class_ids]
-    else:
-        allowed = list(course.classrooms)
-    return sorted(allowed, key=lambda c: c.name)
+def _teacher_can_use(teacher, course_id, class_id):
+    return class_id in teacher_authorization_index(teacher.id).get(course_id, ())
@@ -4,8 +4,13 @@ from __future__ import annotations
 import secrets
 import string
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 
-from typing import Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func, or_
+from werkzeug.security import generate_password_hash
 
 from ..models import User
 
@@ -30,22 +35,101 @@ def _generate_password(length: int = 12) -> str:
     return ''.join(secrets.choice(alphabet) for _ in range(length))
 
 
-def generate_student_credentials(full_name: str, student_number: str) -> Tuple[str, str]:
-    """Return a unique email and strong password for a student."""
-    slug = _slugify(full_name) or 'ogrenci'
-    base_local = f"{student_number}"
-    if slug:
-        base_local = f"{slug}.{student_number}"
+class StudentEmailAllocator:
+    """Hand out unique student emails without probing the database per candidate.
+
+    The emails taken for a ``slug.number`` base (``base@`` and ``base-N@``)
+    are fetched the first time the base is seen. Bulk callers should pass
+    the bases of a whole batch to :meth:`preload`, which fetches them all in
+    one query. Allocated emails are reserved immediately, so a single
+    allocator never returns the same address twice, even before anything is
+    flushed.
+    """
+
+    def __init__(self):
+        self._taken: Set[str] = set()
+        self._loaded_bases: Set[str] = set()
+        self._next_counter: Dict[str, int] = {}
+
+    @staticmethod
+    def base_local(full_name: str, student_number: str) -> str:
+        slug = _slugify(full_name) or 'ogrenci'
+        return f"{slug}.{student_number}"
 
-    counter = 0
-    while True:
+    def allocate(self, full_name: str, student_number: str) -> str:
+        base_local = self.base_local(full_name, student_number)
+        self.preload([base_local])
+
+        counter = self._next_counter.get(base_local, 0)
+        while self._candidate(base_local, counter) in self._taken:
+            counter += 1
+        email = self._candidate(base_local, counter)
+        self._taken.add(email)
+        self._next_counter[base_local] = counter + 1
+        return email
+
+    def preload(self, base_locals: Iterable[str]) -> None:
+        """Fetch the taken emails of every base not loaded yet, in one query."""
+        bases = set(base_locals) - self._loaded_bases
+        if not bases:
+            return
+        # ``base-N`` loses its counter to rtrim, leaving ``base-``.
+        local_part = func.replace(User.email, f'@{STUDENT_EMAIL_DOMAIN}', '')
+        emails = User.query.with_entities(User.email).filter(
+            User.email.like(f'%@{STUDENT_EMAIL_DOMAIN}'),
+            or_(
+                local_part.in_(bases),
+                func.rtrim(local_part, string.digits).in_([f'{base}-' for base in bases]),
+            ),
+        )
+        self._taken.update(email for (email,) in emails)
+        self._loaded_bases.update(bases)
+
+    @staticmethod
+    def _candidate(base_local: str, counter: int) -> str:
         suffix = f"-{counter}" if counter else ''
-        local_part = f"{base_local}{suffix}"
-        email_candidate = f"{local_part}@{STUDENT_EMAIL_DOMAIN}"
-        existing = User.query.filter_by(email=email_candidate).first()
-        if not existing:
-            break
-        counter += 1
+        return f"{base_local}{suffix}@{STUDENT_EMAIL_DOMAIN}"
+
 
+def generate_student_credentials(
+    full_name: str,
+    student_number: str,
+    allocator: Optional[StudentEmailAllocator] = None,
+) -> Tuple[str, str]:
+    """Return a unique email and strong password for a student.
+
+    Bulk callers should share one ``allocator`` so emails stay unique across
+    the whole batch.
+    """
+    allocator = allocator or StudentEmailAllocator()
+    email = allocator.allocate(full_name, student_number)
     password = _generate_password()
-    return email_candidate, password
+    return email, password
+
+
+@contextmanager
+def password_hash_pool(workers: int = 0) -> Iterator[Optional[ProcessPoolExecutor]]:
+    """Yield a process pool for :func:`hash_passwords`, or ``None`` to hash serially.
+
+    Open it once per import and pass it to every :func:`hash_passwords`
+    call, so the worker processes are started only once.
+    """
+    if workers <= 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield executor
+
+
+def hash_passwords(passwords: Sequence[str], executor: Optional[ProcessPoolExecutor] = None) -> List[str]:
+    """Hash ``passwords`` and return the hashes in the same order.
+
+    With an ``executor`` from :func:`password_hash_pool` the PBKDF2 work is
+    spread over its processes; otherwise the passwords are hashed serially
+    in the calling process.
+    """
+    if executor is None or len(passwords) < 2:
+        return [generate_password_hash(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // 16)
+    return list(executor.map(generate_password_hash, passwords, chunksize=chunksize))
@@ -0,0 +1,85 @@
+"""Small in-process caching helpers shared by the route modules."""
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class FileGeneration:
+    """A generation token shared by every worker process through one small file.
+
+    Cached values remember the token they were built under and are rebuilt
+    once it changes; :meth:`bump` writes a fresh token after a committed
+    change, so invalidation reaches every process on its next lookup.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def current(self) -> str:
+        try:
+            with open(self.path, encoding='ascii') as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return ''
+
+    def bump(self) -> None:
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=directory, delete=False, encoding='ascii') as handle:
+            handle.write(uuid.uuid4().hex)
+        os.replace(handle.name, self.path)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire ``ttl`` seconds after being stored.
+
+    With a :class:`FileGeneration`, the whole cache is cleared whenever
+    another process bumps the generation token.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int, ttl: float, generation: Optional[FileGeneration] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = generation
+        self._token = generation.current() if generation else None
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        token = self.generation.current() if self.generation else None
+        with self._lock:
+            if token != self._token:
+                self._entries.clear()
+                self._token = token
+            entry = self._entries.get(key, self._MISSING)
+            if entry is self._MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,186 @@
+"""Maintenance helpers for the denormalized ``attendance_counters`` table."""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from sqlalchemy import bindparam, delete, event, insert, inspect, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .. import db
+from ..models import ATTENDANCE_STATUSES, AttendanceCounter, AttendanceEntry, Student, attendance_statistics
+from ..replicas import RoutingSession
+
+
+STATUSES = ATTENDANCE_STATUSES
+
+CounterKey = Tuple[int, int]
+CounterDeltas = Dict[CounterKey, Dict[str, int]]
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING.
+_CONFLICT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def new_deltas() -> CounterDeltas:
+    """Return an empty delta map keyed by ``(student_id, course_id)``."""
+    return defaultdict(lambda: dict.fromkeys(STATUSES, 0))
+
+
+def track_status(deltas: CounterDeltas, student_id: int, course_id: int, status: str, step: int = 1) -> None:
+    """Record that ``status`` was added (``step=1``) or removed (``step=-1``)."""
+    if status in STATUSES:
+        deltas[(student_id, course_id)][status] += step
+
+
+def track_status_change(deltas: CounterDeltas, student_id: int, course_id: int, old: str, new: str) -> None:
+    if old == new:
+        return
+    track_status(deltas, student_id, course_id, old, -1)
+    track_status(deltas, student_id, course_id, new, 1)
+
+
+def apply_deltas(deltas: CounterDeltas) -> None:
+    """Apply the collected deltas inside the current transaction.
+
+    Missing counter rows are inserted first (concurrent writers creating the
+    same row do not conflict), then every row is incremented in SQL so
+    concurrent writers never overwrite each other's totals.
+    """
+    changes = {key: delta for key, delta in deltas.items() if any(delta.values())}
+    if not changes:
+        return
+
+    _insert_missing_counters(list(changes))
+
+    table = AttendanceCounter.__table__
+    statement = (
+        update(table)
+        .where(table.c.student_id == bindparam('b_student_id'), table.c.course_id == bindparam('b_course_id'))
+        .values(
+            present=table.c.present + bindparam('d_present'),
+            excused=table.c.excused + bindparam('d_excused'),
+            absent=table.c.absent + bindparam('d_absent'),
+            total=table.c.total + bindparam('d_total'),
+        )
+    )
+    db.session.execute(
+        statement,
+        [
+            {
+                'b_student_id': student_id,
+                'b_course_id': course_id,
+                'd_present': delta['present'],
+                'd_excused': delta['excused'],
+                'd_absent': delta['absent'],
+                'd_total': sum(delta.values()),
+            }
+            for (student_id, course_id), delta in changes.items()
+        ],
+    )
+
+
+def _insert_missing_counters(keys: List[CounterKey]) -> None:
+    table = AttendanceCounter.__table__
+    zero = dict.fromkeys((*STATUSES, 'total'), 0)
+    conflict_insert = _CONFLICT_INSERTS.get(db.session.get_bind(mapper=AttendanceCounter).dialect.name)
+    if conflict_insert is None:
+        key_columns = tuple_(table.c.student_id, table.c.course_id)
+        existing = set(
+            db.session.execute(select(table.c.student_id, table.c.course_id).where(key_columns.in_(keys))).all()
+        )
+        keys = [key for key in keys if key not in existing]
+    rows = [{'student_id': student_id, 'course_id': course_id, **zero} for student_id, course_id in keys]
+    if not rows:
+        return
+    if conflict_insert is None:
+        db.session.execute(insert(table), rows)
+    else:
+        db.session.execute(conflict_insert(table).on_conflict_do_nothing(), rows)
+
+
+def create_counter_table() -> int:
+    """Create a missing ``attendance_counters`` table and fill it from the raw entries.
+
+    Like the search index, the table is filled when it is created, so an
+    upgraded database never shows zero absences. Returns the number of
+    counter rows written (0 if the table already existed).
+    """
+    if inspect(db.engine).has_table(AttendanceCounter.__tablename__):
+        return 0
+    # The counters reference students and courses, so create the whole schema.
+    db.create_all()
+    row_count = rebuild_counters()
+    db.session.commit()
+    return row_count
+
+
+def rebuild_counters() -> int:
+    """Recompute the whole table from ``attendance_entries``; returns the row count."""
+    statistics = attendance_statistics()
+    db.session.execute(delete(AttendanceCounter.__table__))
+    if statistics:
+        db.session.execute(
+            insert(AttendanceCounter.__table__),
+            [
+                {'student_id': student_id, 'course_id': course_id, **counts}
+                for (student_id, course_id), counts in statistics.items()
+            ],
+        )
+    return len(statistics)
+
+
+def verify_counters() -> List[Dict[str, object]]:
+    """Compare the counters with the raw entries and return every mismatch."""
+    expected = attendance_statistics()
+    # Plain rows, not ORM objects: the identity map may still hold values
+    # that rebuild_counters() replaced with bulk statements.
+    table = AttendanceCounter.__table__
+    actual = {
+        (row.student_id, row.course_id): {
+            'present': row.present,
+            'excused': row.excused,
+            'absent': row.absent,
+            'total': row.total,
+        }
+        for row in db.session.execute(select(table))
+    }
+    empty = dict.fromkeys((*STATUSES, 'total'), 0)
+
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        expected_counts = expected.get(key, empty)
+        actual_counts = actual.get(key, empty)
+        if expected_counts != actual_counts:
+            mismatches.append(
+                {
+                    'student_id': key[0],
+                    'course_id': key[1],
+                    'expected': expected_counts,
+                    'actual': actual_counts,
+                }
+            )
+    return mismatches
+
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _track_deleted_entries(session, flush_context, instances):
+    # Entries removed through the ORM (e.g. with their record) leave the
+    # counters; a deleted student's counter rows are removed by cascade.
+    deleted_students = {instance.id for instance in session.deleted if isinstance(instance, Student)}
+    entries = [
+        instance
+        for instance in session.deleted
+        if isinstance(instance, AttendanceEntry) and instance.student_id not in deleted_students
+    ]
+    if entries:
+        deltas = flush_context.attributes.setdefault('deleted_entry_deltas', new_deltas())
+        for entry in entries:
+            track_status(deltas, entry.student_id, entry.record.course_id, entry.status, -1)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _apply_deleted_entry_deltas(session, flush_context):
+    deltas = flush_context.attributes.get('deleted_entry_deltas')
+    if deltas:
+        apply_deltas(deltas)
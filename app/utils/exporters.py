@@ -1,11 +1,16 @@
+import codecs
 import csv
 import io
-from datetime import datetime
-from typing import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import pandas as pd
+import pypdfium2 as pdfium
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.styles import StyleSheet1, getSampleStyleSheet
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFError, TTFont
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
@@ -20,10 +25,22 @@ STATUS_LABELS = {
 }
 
 
-def generate_csv(records: Iterable[AttendanceRecord]) -> io.BytesIO:
+CSV_HEADER = ['Ders', 'Sınıf', 'Öğretmen', 'Tarih', 'Öğrenci', 'Durum']
+
+
+def iter_csv(records: Iterable[AttendanceRecord]) -> Iterator[bytes]:
+    """Yield the CSV export as UTF-8 chunks, one per record, starting with the BOM and header."""
     output = io.StringIO()
     writer = csv.writer(output)
-    writer.writerow(['Ders', 'Sınıf', 'Öğretmen', 'Tarih', 'Öğrenci', 'Durum'])
+
+    def flush() -> bytes:
+        chunk = output.getvalue().encode('utf-8')
+        output.seek(0)
+        output.truncate()
+        return chunk
+
+    writer.writerow(CSV_HEADER)
+    yield codecs.BOM_UTF8 + flush()
     for record in records:
         for entry in record.entries:
             writer.writerow(
@@ -36,25 +53,52 @@ def generate_csv(records: Iterable[AttendanceRecord]) -> io.BytesIO:
                     STATUS_LABELS.get(entry.status, entry.status),
                 ]
             )
+        yield flush()
+
+
+def generate_csv(records: Iterable[AttendanceRecord]) -> io.BytesIO:
     buffer = io.BytesIO()
-    buffer.write(output.getvalue().encode('utf-8-sig'))
+    for chunk in iter_csv(records):
+        buffer.write(chunk)
     buffer.seek(0)
     return buffer
 
 
-def generate_pdf(records: Iterable[AttendanceRecord]) -> io.BytesIO:
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = []
+BREACH_CSV_COLUMNS = {
+    'class_name': 'Sınıf',
+    'student_number': 'Okul No',
+    'student_name': 'Öğrenci',
+    'course_code': 'Ders Kodu',
+    'course_name': 'Ders',
+    'total': 'Toplam Yoklama',
+    'excused': 'Mazeretli',
+    'excused_pct': 'Mazeretli %',
+    'max_excused_percentage': 'Mazeretli Sınır %',
+    'absent': 'Mazeretsiz',
+    'absent_pct': 'Mazeretsiz %',
+    'max_unexcused_percentage': 'Mazeretsiz Sınır %',
+}
 
-    fonts_to_register = {
-        'DejaVuSans': '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
-        'DejaVuSans-Bold': '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
-    }
+
+def generate_breach_csv(breaches: pd.DataFrame) -> bytes:
+    """Render :func:`app.utils.reports.absence_breaches` as a UTF-8 CSV with BOM."""
+    frame = breaches[list(BREACH_CSV_COLUMNS)].rename(columns=BREACH_CSV_COLUMNS)
+    return codecs.BOM_UTF8 + frame.to_csv(index=False).encode('utf-8')
+
+
+FONTS_TO_REGISTER = {
+    'DejaVuSans': '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    'DejaVuSans-Bold': '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+}
+
+
+@lru_cache(maxsize=None)
+def _pdf_styles() -> Tuple[StyleSheet1, TableStyle]:
+    """Register fonts and build the shared styles once per process."""
+    styles = getSampleStyleSheet()
     registered_fonts = set(pdfmetrics.getRegisteredFontNames())
 
-    for font_name, font_path in fonts_to_register.items():
+    for font_name, font_path in FONTS_TO_REGISTER.items():
         if font_name in registered_fonts:
             continue
         try:
@@ -71,34 +115,80 @@ def generate_pdf(records: Iterable[AttendanceRecord]) -> io.BytesIO:
 
     header_font = 'DejaVuSans-Bold' if 'DejaVuSans-Bold' in registered_fonts else 'Helvetica-Bold'
     body_font = 'DejaVuSans' if 'DejaVuSans' in registered_fonts else 'Helvetica'
+    table_style = TableStyle(
+        [
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), header_font),
+            ('FONTNAME', (0, 1), (-1, -1), body_font),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ]
+    )
+    return styles, table_style
 
-    for record in records:
-        story.append(Paragraph(f"Ders: {record.course.name} ({record.course.code})", styles['Heading3']))
-        story.append(Paragraph(f"Sınıf: {record.classroom.name}", styles['Normal']))
-        story.append(Paragraph(f"Öğretmen: {record.teacher.full_name}", styles['Normal']))
-        story.append(Paragraph(f"Tarih: {record.session_date.strftime('%d.%m.%Y %H:%M')}", styles['Normal']))
+
+def _pdf_record_data(record: AttendanceRecord) -> Dict[str, object]:
+    """Flatten a record into plain, picklable values for the PDF renderer."""
+    return {
+        'course': f"{record.course.name} ({record.course.code})",
+        'classroom': record.classroom.name,
+        'teacher': record.teacher.full_name,
+        'date': record.session_date.strftime('%d.%m.%Y %H:%M'),
+        'rows': [
+            (entry.student.full_name, STATUS_LABELS.get(entry.status, entry.status))
+            for entry in record.entries
+        ],
+    }
+
+
+def _render_pdf(records_data: List[Dict[str, object]]) -> bytes:
+    styles, table_style = _pdf_styles()
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    story = []
+
+    for data in records_data:
+        story.append(Paragraph(f"Ders: {data['course']}", styles['Heading3']))
+        story.append(Paragraph(f"Sınıf: {data['classroom']}", styles['Normal']))
+        story.append(Paragraph(f"Öğretmen: {data['teacher']}", styles['Normal']))
+        story.append(Paragraph(f"Tarih: {data['date']}", styles['Normal']))
         story.append(Spacer(1, 8))
-        data = [['Öğrenci', 'Durum']]
-        for entry in record.entries:
-            data.append([entry.student.full_name, STATUS_LABELS.get(entry.status, entry.status)])
-        table = Table(data, hAlign='LEFT')
-        table.setStyle(
-            TableStyle(
-                [
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), header_font),
-                    ('FONTNAME', (0, 1), (-1, -1), body_font),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ]
-            )
-        )
+        table = Table([['Öğrenci', 'Durum'], *data['rows']], hAlign='LEFT')
+        table.setStyle(table_style)
         story.append(table)
         story.append(Spacer(1, 16))
 
     doc.build(story)
+    return buffer.getvalue()
+
+
+def _merge_pdfs(documents: Iterable[bytes]) -> io.BytesIO:
+    merged = pdfium.PdfDocument.new()
+    for document in documents:
+        merged.import_pages(pdfium.PdfDocument(document))
+    buffer = io.BytesIO()
+    merged.save(buffer)
     buffer.seek(0)
     return buffer
+
+
+def generate_pdf(records: Iterable[AttendanceRecord], workers: int = 0, chunk_size: int = 200) -> io.BytesIO:
+    """Render the attendance PDF.
+
+    The records are split into chunks of ``chunk_size``, each rendered as its
+    own document starting on a new page, and the pages are concatenated in
+    order. With ``workers`` > 1 the chunks are rendered in a process pool;
+    either way the output is the same page for page.
+    """
+    records_data = [_pdf_record_data(record) for record in records]
+    chunks = [records_data[start:start + chunk_size] for start in range(0, len(records_data), chunk_size)]
+    if len(chunks) <= 1:
+        return io.BytesIO(_render_pdf(records_data))
+    if workers <= 1:
+        return _merge_pdfs(map(_render_pdf, chunks))
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_pdf_styles) as executor:
+        return _merge_pdfs(executor.map(_render_pdf, chunks))
@@ -0,0 +1,106 @@
+"""Server-side storage for student import reports and generated credentials.
+
+Both can hold thousands of rows, far more than the cookie-backed session
+can carry, so they are written under ``instance/imports`` and the session
+keeps only their ids. Credentials are appended as JSON lines while an
+import runs, so they never have to be held in memory at once. Files older
+than :data:`MAX_AGE` are removed whenever a new one is created.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from flask import current_app
+
+
+MAX_AGE = 24 * 60 * 60  # seconds
+
+_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+def new_id() -> str:
+    _purge_stale()
+    return uuid.uuid4().hex
+
+
+def save_report(report: Dict[str, object]) -> str:
+    """Store an import or preview report; returns its id."""
+    report_id = new_id()
+    with _open(_path('report', report_id), 'w') as handle:
+        json.dump(report, handle, ensure_ascii=False)
+    return report_id
+
+
+def pop_report(report_id: Optional[str]) -> Optional[Dict[str, object]]:
+    """Return a stored report and delete it, or ``None`` if it is gone."""
+    path = _path('report', report_id)
+    if path is None:
+        return None
+    try:
+        with open(path, encoding='utf-8') as handle:
+            report = json.load(handle)
+    except FileNotFoundError:
+        return None
+    os.remove(path)
+    return report
+
+
+def append_credentials(credentials_id: str, credentials: Iterable[Dict[str, object]]) -> None:
+    with _open(_path('credentials', credentials_id), 'a') as handle:
+        for credential in credentials:
+            handle.write(json.dumps(credential, ensure_ascii=False) + '\n')
+
+
+def iter_credentials(credentials_id: Optional[str]) -> Iterator[Dict[str, object]]:
+    path = _path('credentials', credentials_id)
+    if path is None or not os.path.exists(path):
+        return
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            yield json.loads(line)
+
+
+def read_credentials(credentials_id: Optional[str], limit: int) -> tuple:
+    """Return the first ``limit`` credentials and the total count."""
+    shown: List[Dict[str, object]] = []
+    total = 0
+    for credential in iter_credentials(credentials_id):
+        if total < limit:
+            shown.append(credential)
+        total += 1
+    return shown, total
+
+
+def _directory() -> str:
+    return os.path.join(current_app.instance_path, 'imports')
+
+
+def _path(kind: str, item_id: Optional[str]) -> Optional[str]:
+    if not item_id or not _ID_PATTERN.match(item_id):
+        return None
+    return os.path.join(_directory(), f'{kind}-{item_id}.json')
+
+
+def _open(path: str, mode: str):
+    # Credentials contain passwords: keep the files private to the app user.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if mode == 'a' else os.O_TRUNC)
+    return os.fdopen(os.open(path, flags, 0o600), mode, encoding='utf-8')
+
+
+def _purge_stale() -> None:
+    directory = _directory()
+    if not os.path.isdir(directory):
+        return
+    cutoff = time.time() - MAX_AGE
+    for entry in os.scandir(directory):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass
@@ -1,72 +1,124 @@
 import csv
 import io
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from zipfile import BadZipFile
 
 import pandas as pd
 import pdfplumber
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
 
 
 REQUIRED_HEADERS = {'ad', 'soyad', 'okul_numarasi', 'sinif'}
 
 
+def _cell(row: Dict[str, object], key: str) -> str:
+    value = row.get(key)
+    return '' if value is None else str(value).strip()
+
+
+def _student_row(row: Dict[str, object], row_index: int) -> Dict[str, object]:
+    return {
+        'full_name': f"{_cell(row, 'ad')} {_cell(row, 'soyad')}".strip(),
+        'student_number': _cell(row, 'okul_numarasi'),
+        'class_name': _cell(row, 'sinif'),
+        'source_row': row_index,
+    }
+
+
+def iter_csv(file_storage) -> Iterator[Dict[str, object]]:
+    """Decode a CSV upload incrementally and yield normalized student dictionaries.
+
+    Only one row is held in memory at a time, so arbitrarily large rosters
+    can be fed to a chunked import.
+    """
+    file_storage.stream.seek(0)
+    text_stream = io.TextIOWrapper(file_storage.stream, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.DictReader(text_stream)
+        headers = {h.strip().lower() for h in reader.fieldnames or []}
+        if not REQUIRED_HEADERS.issubset(headers):
+            raise ValueError(
+                'CSV başlıkları eksik. Gerekli başlıklar: ad, soyad, okul_numarasi, sinif',
+            )
+        for row_index, row in enumerate(reader, start=2):
+            yield _student_row(row, row_index)
+    finally:
+        text_stream.detach()
+
+
 def parse_csv(file_storage) -> List[Dict[str, str]]:
     """Parse a CSV file and return normalized student dictionaries."""
-    file_storage.stream.seek(0)
-    data = file_storage.read().decode('utf-8-sig')
-    reader = csv.DictReader(io.StringIO(data))
-    headers = {h.strip().lower() for h in reader.fieldnames or []}
-    if not REQUIRED_HEADERS.issubset(headers):
-        raise ValueError(
-            'CSV başlıkları eksik. Gerekli başlıklar: ad, soyad, okul_numarasi, sinif',
-        )
+    return list(iter_csv(file_storage))
 
-    students: List[Dict[str, str]] = []
-    for row_index, row in enumerate(reader, start=2):
-        students.append(
-            {
-                'full_name': f"{row.get('ad', '').strip()} {row.get('soyad', '').strip()}".strip(),
-                'student_number': str(row.get('okul_numarasi', '')).strip(),
-                'class_name': row.get('sinif', '').strip(),
-                'source_row': row_index,
-            }
-        )
-    return students
 
+def _extract_page_tables(data: bytes, page_numbers: Sequence[int]) -> List[Optional[List[List[Optional[str]]]]]:
+    """Extract the first table of each page; runs in a pool worker for parallel imports."""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return [pdf.pages[page_number].extract_table() for page_number in page_numbers]
+
+
+def _iter_page_tables(data: bytes, workers: int) -> Iterator[Optional[List[List[Optional[str]]]]]:
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        page_count = len(pdf.pages)
+    if workers <= 1 or page_count < 2:
+        yield from _extract_page_tables(data, range(page_count))
+        return
+
+    workers = min(workers, page_count)
+    batch_size = max(1, -(-page_count // (workers * 2)))
+    page_ranges = [range(start, min(start + batch_size, page_count)) for start in range(0, page_count, batch_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for tables in executor.map(_extract_page_tables, repeat(data), page_ranges):
+            yield from tables
 
-def parse_pdf(file_storage) -> List[Dict[str, str]]:
-    """Parse a PDF table and return normalized student dictionaries."""
+
+def parse_pdf(file_storage, workers: int = 0) -> List[Dict[str, str]]:
+    """Parse a PDF table and return normalized student dictionaries.
+
+    With ``workers`` > 1 page ranges are extracted in a process pool and
+    merged back in page order. ``source_row`` counts data rows across the
+    whole document, with the header as row 1. Pages without a header row
+    are read as a continuation of the previous page's table.
+    """
     file_storage.stream.seek(0)
+    data = file_storage.read()
     students: List[Dict[str, str]] = []
-    with pdfplumber.open(file_storage) as pdf:
-        for page in pdf.pages:
-            table = page.extract_table()
-            if not table:
-                continue
-            headers = [c.strip().lower() for c in table[0]]
-            df = pd.DataFrame(table[1:], columns=headers).fillna('')
-            if not REQUIRED_HEADERS.issubset(set(df.columns)):
-                continue
-            for row_index, row in enumerate(df.to_dict(orient='records'), start=2):
-                students.append(
-                    {
-                        'full_name': f"{str(row.get('ad', '')).strip()} {str(row.get('soyad', '')).strip()}".strip(),
-                        'student_number': str(row.get('okul_numarasi', '')).strip(),
-                        'class_name': str(row.get('sinif', '')).strip(),
-                        'source_row': row_index,
-                    }
-                )
+    headers: Optional[List[str]] = None
+    row_index = 1
+
+    for table in _iter_page_tables(data, workers):
+        if not table:
+            continue
+        first_row = [str(cell or '').strip().lower() for cell in table[0]]
+        if REQUIRED_HEADERS.issubset(first_row):
+            headers, body = first_row, table[1:]
+        elif headers and len(first_row) == len(headers):
+            body = table
+        else:
+            continue
+        for cells in body:
+            row_index += 1
+            students.append(_student_row(dict(zip(headers, cells)), row_index))
+
     if not students:
         raise ValueError('PDF içeriği okunamadı. Lütfen tablo formatında olduğundan emin olun.')
     return students
 
 
-def parse_excel(file_storage) -> List[Dict[str, str]]:
-    """Parse an Excel file (.xls/.xlsx) and return normalized student dictionaries."""
-    file_storage.stream.seek(0)
+def _excel_value(value: object) -> object:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _iter_excel_pandas(data: bytes) -> Iterator[Dict[str, object]]:
+    """Fallback for legacy ``.xls`` workbooks that openpyxl cannot open."""
     try:
-        data = file_storage.read()
         dataframe = pd.read_excel(io.BytesIO(data), dtype=str)
-    except ValueError as exc:  # noqa: BLE001
+    except (ValueError, ImportError) as exc:  # noqa: BLE001
         raise ValueError('Excel dosyası okunamadı. Lütfen geçerli bir dosya yükleyin.') from exc
 
     dataframe.columns = [str(col).strip().lower() for col in dataframe.columns]
@@ -74,20 +126,81 @@ def parse_excel(file_storage) -> List[Dict[str, str]]:
         raise ValueError(
             'Excel başlıkları eksik. Gerekli başlıklar: ad, soyad, okul_numarasi, sinif',
         )
+    for row_index, row in enumerate(dataframe.fillna('').to_dict(orient='records'), start=2):
+        yield _student_row(row, row_index)
 
-    dataframe = dataframe.fillna('')
 
-    students: List[Dict[str, str]] = []
-    for row_index, row in enumerate(dataframe.to_dict(orient='records'), start=2):
-        students.append(
-            {
-                'full_name': f"{str(row.get('ad', '')).strip()} {str(row.get('soyad', '')).strip()}".strip(),
-                'student_number': str(row.get('okul_numarasi', '')).strip(),
-                'class_name': str(row.get('sinif', '')).strip(),
-                'source_row': row_index,
-            }
-        )
+def iter_excel(file_storage) -> Iterator[Dict[str, object]]:
+    """Stream an ``.xlsx`` upload row by row with openpyxl's read-only mode.
+
+    Headers are mapped once and every data row is yielded as the same
+    normalized dictionary :func:`iter_csv` produces. Blank rows are skipped
+    but ``source_row`` keeps the worksheet row number.
+    """
+    file_storage.stream.seek(0)
+    try:
+        workbook = load_workbook(file_storage.stream, read_only=True, data_only=True)
+    except (InvalidFileException, BadZipFile):
+        file_storage.stream.seek(0)
+        yield from _iter_excel_pandas(file_storage.read())
+        return
+    except (KeyError, OSError, ValueError) as exc:
+        raise ValueError('Excel dosyası okunamadı. Lütfen geçerli bir dosya yükleyin.') from exc
 
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [str(cell).strip().lower() if cell is not None else '' for cell in next(rows, ())]
+        if not REQUIRED_HEADERS.issubset(headers):
+            raise ValueError(
+                'Excel başlıkları eksik. Gerekli başlıklar: ad, soyad, okul_numarasi, sinif',
+            )
+        for row_index, values in enumerate(rows, start=2):
+            if all(value is None or value == '' for value in values):
+                continue
+            yield _student_row(dict(zip(headers, map(_excel_value, values))), row_index)
+    finally:
+        workbook.close()
+
+
+def parse_excel(file_storage) -> List[Dict[str, str]]:
+    """Parse an Excel file (.xls/.xlsx) and return normalized student dictionaries."""
+    students = list(iter_excel(file_storage))
     if not students:
         raise ValueError('Excel dosyasında öğrenci verisi bulunamadı.')
     return students
+
+
+def validate_students(
+    students: Iterable[Dict[str, object]],
+    existing_numbers: Iterable[str],
+    existing_class_names: Iterable[str],
+) -> Dict[str, object]:
+    """Dry-run the import checks on a columnar frame without touching the database.
+
+    Produces the same skip reasons, in the same row order, as the real
+    import: rows without a number, and rows whose number is already
+    registered or appeared earlier in the file. Class names that do not
+    exist yet are reported separately because the import creates them.
+    """
+    frame = pd.DataFrame.from_records(
+        list(students),
+        columns=['full_name', 'student_number', 'class_name', 'source_row'],
+    )
+    numbers = frame['student_number'].fillna('').astype(str).str.strip()
+    class_names = frame['class_name'].fillna('').astype(str).str.strip().replace('', 'Genel')
+
+    missing = numbers == ''
+    taken = ~missing & (numbers.isin(set(existing_numbers)) | numbers.duplicated(keep='first'))
+    skipped = missing | taken
+    reasons = missing.map({True: 'Okul numarası eksik.', False: 'Okul numarası zaten kayıtlı.'})
+
+    new_class_names = sorted(set(class_names[~skipped]) - set(existing_class_names))
+    return {
+        'total': len(frame),
+        'created': int((~skipped).sum()),
+        'skipped_rows': [
+            {'row': row, 'reason': reason}
+            for row, reason in zip(frame['source_row'][skipped].tolist(), reasons[skipped].tolist())
+        ],
+        'new_classes': new_class_names,
+    }
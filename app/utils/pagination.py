@@ -0,0 +1,48 @@
+"""Keyset (cursor) pagination helpers for ``(session_date, id)`` ordered queries."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+
+
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(session_date: datetime, row_id: int) -> str:
+    return f"{session_date.isoformat()}_{row_id}"
+
+
+def decode_cursor(value: Optional[str]) -> Optional[Cursor]:
+    """Parse a cursor produced by :func:`encode_cursor`; invalid values yield ``None``."""
+    if not value:
+        return None
+    date_part, _, id_part = value.rpartition('_')
+    try:
+        return datetime.fromisoformat(date_part), int(id_part)
+    except ValueError:
+        return None
+
+
+def keyset_page(
+    query,
+    date_column,
+    id_column,
+    cursor: Optional[Cursor],
+    per_page: int,
+    cursor_of: Callable[[Any], Cursor] = lambda row: (row.session_date, row.id),
+) -> Tuple[List[Any], Optional[str]]:
+    """Return one page of ``query`` (newest first) and the cursor of the next page.
+
+    The query must already be ordered by ``date_column DESC, id_column DESC``.
+    One extra row is fetched to probe for a further page, so no COUNT query
+    is needed and the cost stays flat however deep the client pages.
+    """
+    if cursor:
+        query = query.filter(tuple_(date_column, id_column) < tuple_(*cursor))
+    rows = query.limit(per_page + 1).all()
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    return rows, encode_cursor(*cursor_of(rows[-1]))
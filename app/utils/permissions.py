@@ -0,0 +1,77 @@
+"""Cached course/classroom permission index for teachers."""
+from __future__ import annotations
+
+import os
+from typing import Dict, FrozenSet, Set, Tuple
+
+from flask import current_app
+from sqlalchemy import exists, select
+
+from .. import db
+from ..models import ClassTeacher, CourseClass, CourseTeacher
+from .cache import FileGeneration
+
+
+AuthorizationIndex = Dict[int, FrozenSet[int]]
+
+GENERATION_FILE = 'teacher-permissions.generation'
+
+
+class _AuthorizationStore:
+    def __init__(self, generation: FileGeneration):
+        self.generation = generation
+        self.entries: Dict[int, Tuple[str, AuthorizationIndex]] = {}
+
+
+def _store() -> _AuthorizationStore:
+    store = current_app.extensions.get('teacher_authorizations')
+    if store is None:
+        generation = FileGeneration(os.path.join(current_app.instance_path, GENERATION_FILE))
+        store = current_app.extensions.setdefault('teacher_authorizations', _AuthorizationStore(generation))
+    return store
+
+
+def teacher_authorization_index(teacher_id: int) -> AuthorizationIndex:
+    """Return ``{course_id: frozenset(classroom_ids)}`` the teacher may take attendance for.
+
+    A teacher assigned to specific classrooms is limited to those classrooms
+    of each course; a teacher without classroom assignments may use every
+    classroom of their courses. The index is built with one query and cached
+    until :func:`invalidate_teacher_authorizations` is called.
+    """
+    store = _store()
+    generation = store.generation.current()
+    cached = store.entries.get(teacher_id)
+    if cached and cached[0] == generation:
+        return cached[1]
+    index = _build_index(teacher_id)
+    store.entries[teacher_id] = (generation, index)
+    return index
+
+
+def invalidate_teacher_authorizations() -> None:
+    """Drop every cached index; call after committing course, class or teacher changes."""
+    store = _store()
+    store.entries.clear()
+    store.generation.bump()
+
+
+def _build_index(teacher_id: int) -> AuthorizationIndex:
+    assigned = exists().where(
+        ClassTeacher.teacher_id == teacher_id,
+        ClassTeacher.classroom_id == CourseClass.classroom_id,
+    )
+    has_assignments = exists().where(ClassTeacher.teacher_id == teacher_id)
+    rows = db.session.execute(
+        select(CourseTeacher.course_id, CourseClass.classroom_id, assigned, has_assignments)
+        .select_from(CourseTeacher)
+        .outerjoin(CourseClass, CourseClass.course_id == CourseTeacher.course_id)
+        .where(CourseTeacher.teacher_id == teacher_id)
+    ).all()
+
+    index: Dict[int, Set[int]] = {}
+    for course_id, classroom_id, is_assigned, restricted in rows:
+        allowed = index.setdefault(course_id, set())
+        if classroom_id is not None and (is_assigned or not restricted):
+            allowed.add(classroom_id)
+    return {course_id: frozenset(classroom_ids) for course_id, classroom_ids in index.items()}
@@ -0,0 +1,150 @@
+"""School-wide attendance reports computed from the counter and rollup tables, never the raw entries."""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import func, select
+
+from .. import db
+from ..models import AttendanceCounter, AttendanceDailyRollup, ClassRoom, Course, Student, StudentCourse, User
+
+
+# group -> (rollup column, name query)
+TREND_GROUPS = {
+    'classroom': (AttendanceDailyRollup.classroom_id, select(ClassRoom.id, ClassRoom.name)),
+    'course': (AttendanceDailyRollup.course_id, select(Course.id, Course.name)),
+    'teacher': (AttendanceDailyRollup.teacher_id, select(User.id, User.full_name)),
+}
+TREND_PERIODS = ('day', 'week')
+
+
+def absence_breaches(classroom_id: Optional[int] = None, course_id: Optional[int] = None) -> pd.DataFrame:
+    """Return every enrolment whose excused or unexcused absence rate exceeds the course limit.
+
+    The per-enrolment totals come from one pass over ``attendance_counters``
+    joined with ``student_courses``; the percentages and the threshold
+    comparison are computed column-wise, and names are attached only to
+    the breaching rows. Rates follow the student dashboard: ``excused /
+    total`` and ``absent / total``, only for enrolments with at least one
+    roll call.
+    """
+    query = (
+        select(
+            AttendanceCounter.student_id,
+            AttendanceCounter.course_id,
+            AttendanceCounter.total,
+            AttendanceCounter.excused,
+            AttendanceCounter.absent,
+        )
+        .join(
+            StudentCourse,
+            (StudentCourse.student_id == AttendanceCounter.student_id)
+            & (StudentCourse.course_id == AttendanceCounter.course_id),
+        )
+        .where(AttendanceCounter.total > 0)
+    )
+    if classroom_id:
+        query = query.where(
+            AttendanceCounter.student_id.in_(select(Student.id).where(Student.classroom_id == classroom_id))
+        )
+    if course_id:
+        query = query.where(AttendanceCounter.course_id == course_id)
+
+    counts = _frame(db.session.execute(query).all(), ['student_id', 'course_id', 'total', 'excused', 'absent'])
+    courses = _frame(
+        db.session.execute(
+            select(Course.id, Course.name, Course.code, Course.max_excused_percentage, Course.max_unexcused_percentage)
+        ).all(),
+        ['course_id', 'course_name', 'course_code', 'max_excused_percentage', 'max_unexcused_percentage'],
+    )
+    frame = counts.merge(courses, on='course_id')
+
+    excused_pct = frame['excused'] / frame['total'] * 100
+    absent_pct = frame['absent'] / frame['total'] * 100
+    # A course without a limit never breaches it.
+    frame['excused_breach'] = excused_pct > frame['max_excused_percentage'].astype(float).fillna(float('inf'))
+    frame['absent_breach'] = absent_pct > frame['max_unexcused_percentage'].astype(float).fillna(float('inf'))
+    frame['excused_pct'] = excused_pct.round(1)
+    frame['absent_pct'] = absent_pct.round(1)
+    breaches = frame[frame['excused_breach'] | frame['absent_breach']]
+
+    student_ids = breaches['student_id'].unique().tolist()
+    students = _frame(
+        db.session.execute(
+            select(Student.id, Student.full_name, Student.student_number, ClassRoom.name)
+            .join(ClassRoom, ClassRoom.id == Student.classroom_id)
+            .where(Student.id.in_(student_ids))
+        ).all()
+        if student_ids
+        else [],
+        ['student_id', 'student_name', 'student_number', 'class_name'],
+    )
+    breaches = breaches.merge(students, on='student_id')
+    return breaches.sort_values(['class_name', 'student_name', 'course_name'], ignore_index=True)
+
+
+def attendance_trends(
+    group: str,
+    period: str,
+    date_from: date,
+    date_to: date,
+    classroom_id: Optional[int] = None,
+    course_id: Optional[int] = None,
+) -> pd.DataFrame:
+    """Return attendance rates (present / total, in percent) per ``group`` and ``period``.
+
+    Reads only ``attendance_daily_rollups``: the database sums the day rows
+    per group, pandas folds days into weeks (starting on Monday) and
+    pivots. Rows are group names plus a final ``Genel`` row over all
+    groups; columns are the first day of each period.
+    """
+    dimension, names_query = TREND_GROUPS[group]
+    query = (
+        select(
+            AttendanceDailyRollup.day,
+            dimension,
+            func.sum(AttendanceDailyRollup.present),
+            func.sum(AttendanceDailyRollup.total),
+        )
+        .where(AttendanceDailyRollup.day >= date_from, AttendanceDailyRollup.day <= date_to)
+        .group_by(AttendanceDailyRollup.day, dimension)
+    )
+    if classroom_id:
+        query = query.where(AttendanceDailyRollup.classroom_id == classroom_id)
+    if course_id:
+        query = query.where(AttendanceDailyRollup.course_id == course_id)
+
+    frame = _frame(db.session.execute(query).all(), ['day', 'group_id', 'present', 'total'])
+    if frame.empty:
+        return pd.DataFrame()
+    frame['period'] = pd.to_datetime(frame['day'])
+    if period == 'week':
+        frame['period'] -= pd.to_timedelta(frame['period'].dt.weekday, unit='D')
+
+    group_ids = frame['group_id'].unique().tolist()
+    id_column = names_query.selected_columns[0]
+    names = dict(db.session.execute(names_query.where(id_column.in_(group_ids))).all())
+    frame['name'] = frame['group_id'].map(names).fillna('-')
+
+    per_group = frame.groupby(['name', 'period'])[['present', 'total']].sum()
+    overall = frame.groupby('period')[['present', 'total']].sum()
+    table = pd.concat([_rates(per_group).unstack('period'), _rates(overall).to_frame('Genel').T])
+    table.columns = [column.date() for column in table.columns]
+    return table
+
+
+def default_trend_range(today: date) -> tuple:
+    """The last eight weeks, starting on a Monday."""
+    start = today - timedelta(days=today.weekday()) - timedelta(weeks=7)
+    return start, today
+
+
+def _rates(sums: pd.DataFrame) -> pd.Series:
+    return (sums['present'] / sums['total'].where(sums['total'] > 0) * 100).round(1)
+
+
+def _frame(rows, columns) -> pd.DataFrame:
+    # Building from columns is several times faster than from a list of Row objects.
+    return pd.DataFrame(dict(zip(columns, zip(*rows))) if rows else {}, columns=columns)
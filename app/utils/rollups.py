@@ -0,0 +1,127 @@
+"""Maintenance helpers for the ``attendance_daily_rollups`` table."""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import Date, and_, case, delete, distinct, event, func, insert, or_, select, union, update
+
+from .. import db
+from ..models import AttendanceDailyRollup, AttendanceEntry, AttendanceRecord, RollupWatermark
+from ..replicas import RoutingSession
+
+
+WATERMARK_NAME = 'attendance_daily'
+
+# Rows are stamped with the writer's clock before its transaction commits, so
+# the watermark trails the refresh start; re-reading a few minutes is harmless
+# because whole days are recomputed.
+WATERMARK_LAG = timedelta(minutes=5)
+
+
+def _day():
+    return func.date(AttendanceRecord.session_date, type_=Date)
+
+
+def _daily_totals(days: Optional[Iterable[date]] = None):
+    """Grouped per (day, course, classroom, teacher) totals over the raw tables."""
+    day = _day()
+    query = (
+        select(
+            day.label('day'),
+            AttendanceRecord.course_id,
+            AttendanceRecord.classroom_id,
+            AttendanceRecord.teacher_id,
+            func.count(distinct(AttendanceRecord.id)).label('sessions'),
+            func.sum(case((AttendanceEntry.status == 'present', 1), else_=0)).label('present'),
+            func.sum(case((AttendanceEntry.status == 'excused', 1), else_=0)).label('excused'),
+            func.sum(case((AttendanceEntry.status == 'absent', 1), else_=0)).label('absent'),
+            func.count(AttendanceEntry.id).label('total'),
+        )
+        .select_from(AttendanceRecord)
+        .outerjoin(AttendanceEntry, AttendanceEntry.record_id == AttendanceRecord.id)
+        .group_by(day, AttendanceRecord.course_id, AttendanceRecord.classroom_id, AttendanceRecord.teacher_id)
+    )
+    if days is not None:
+        # Day ranges keep the (session_date, id) index usable.
+        query = query.where(
+            or_(
+                *(
+                    and_(
+                        AttendanceRecord.session_date >= datetime.combine(day_, time.min),
+                        AttendanceRecord.session_date < datetime.combine(day_ + timedelta(days=1), time.min),
+                    )
+                    for day_ in days
+                )
+            )
+        )
+    return query
+
+
+def _insert_totals(days: Optional[Iterable[date]] = None) -> None:
+    columns = ['day', 'course_id', 'classroom_id', 'teacher_id', 'sessions', 'present', 'excused', 'absent', 'total']
+    db.session.execute(insert(AttendanceDailyRollup).from_select(columns, _daily_totals(days)))
+
+
+def _set_watermark(value: datetime) -> None:
+    watermark = db.session.get(RollupWatermark, WATERMARK_NAME)
+    if watermark is None:
+        db.session.add(RollupWatermark(name=WATERMARK_NAME, refreshed_until=value))
+    else:
+        watermark.refreshed_until = max(watermark.refreshed_until, value)
+
+
+def rebuild_rollups() -> int:
+    """Recompute the whole table from the raw records; returns the row count."""
+    started = datetime.utcnow()
+    db.session.execute(delete(AttendanceDailyRollup))
+    _insert_totals()
+    _set_watermark(started - WATERMARK_LAG)
+    return db.session.scalar(select(func.count()).select_from(AttendanceDailyRollup))
+
+
+def refresh_rollups() -> int:
+    """Recompute only the days touched since the watermark; returns the number of days.
+
+    Records and entries are found through their ``updated_at`` indexes, so
+    the cost follows the amount of new data rather than the table size.
+    Entries deleted through the ORM (e.g. with their student) touch their
+    record, see :func:`_touch_records_of_deleted_entries`; other deletions
+    need :func:`rebuild_rollups`. Without a watermark the table is rebuilt.
+    """
+    watermark = db.session.get(RollupWatermark, WATERMARK_NAME)
+    if watermark is None:
+        rebuild_rollups()
+        return -1
+
+    started = datetime.utcnow()
+    since = watermark.refreshed_until
+    changed_days = union(
+        select(_day()).where(AttendanceRecord.updated_at > since),
+        select(_day())
+        .join(AttendanceEntry, AttendanceEntry.record_id == AttendanceRecord.id)
+        .where(AttendanceEntry.updated_at > since),
+    )
+    days = sorted(set(db.session.scalars(changed_days)))
+    if days:
+        db.session.execute(delete(AttendanceDailyRollup).where(AttendanceDailyRollup.day.in_(days)))
+        _insert_totals(days)
+    _set_watermark(started - WATERMARK_LAG)
+    return len(days)
+
+
+def rollups_refreshed_until() -> Optional[datetime]:
+    watermark = db.session.get(RollupWatermark, WATERMARK_NAME)
+    return watermark.refreshed_until if watermark else None
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _touch_records_of_deleted_entries(session, flush_context):
+    record_ids = {
+        instance.record_id for instance in session.deleted if isinstance(instance, AttendanceEntry)
+    }
+    if record_ids:
+        records = AttendanceRecord.__table__
+        session.connection().execute(
+            update(records).where(records.c.id.in_(record_ids)).values(updated_at=datetime.utcnow())
+        )
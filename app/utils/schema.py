@@ -0,0 +1,98 @@
+"""Schema maintenance: add missing indexes to existing databases and check query plans."""
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import inspect, select, text
+
+from .. import db
+from ..models import (
+    AttendanceEntry,
+    AttendanceRecord,
+    ClassTeacher,
+    CourseTeacher,
+    Student,
+    StudentCourse,
+    _attendance_counts_query,
+)
+
+
+_SQLITE_TABLE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+
+
+def ensure_indexes() -> List[str]:
+    """Create every index declared on the models that is missing; returns their names.
+
+    ``db.create_all`` skips tables that already exist, so databases created
+    before an index was declared only pick it up through this function.
+    """
+    inspector = inspect(db.engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in existing:
+                index.create(db.engine)
+                created.append(index.name)
+    return created
+
+
+def hot_queries() -> Dict[str, object]:
+    """Representative statements for the most frequent attendance access paths."""
+    start, end = datetime(2024, 1, 1), datetime(2024, 2, 1)
+    newest_first = (AttendanceRecord.session_date.desc(), AttendanceRecord.id.desc())
+    return {
+        'latest_records': select(AttendanceRecord).order_by(*newest_first).limit(5),
+        'teacher_history': (
+            select(AttendanceRecord).where(AttendanceRecord.teacher_id == 1).order_by(*newest_first).limit(51)
+        ),
+        'records_by_course_and_date': (
+            select(AttendanceRecord)
+            .where(AttendanceRecord.course_id == 1, AttendanceRecord.session_date.between(start, end))
+            .order_by(*newest_first)
+        ),
+        'records_by_classroom_and_date': (
+            select(AttendanceRecord)
+            .where(AttendanceRecord.classroom_id == 1, AttendanceRecord.session_date.between(start, end))
+            .order_by(*newest_first)
+        ),
+        'record_entries': select(AttendanceEntry).where(AttendanceEntry.record_id == 1),
+        'student_statistics': _attendance_counts_query(student_ids=[1]).statement,
+        'absences_by_student': select(AttendanceEntry.id).where(
+            AttendanceEntry.student_id == 1, AttendanceEntry.status == 'absent'
+        ),
+        'classroom_students': select(Student.id).where(Student.classroom_id == 1),
+        'course_students': select(StudentCourse.student_id).where(StudentCourse.course_id == 1),
+        'teacher_courses': select(CourseTeacher.course_id).where(CourseTeacher.teacher_id == 1),
+        'teacher_classes': select(ClassTeacher.classroom_id).where(ClassTeacher.teacher_id == 1),
+        'rollup_changed_records': select(AttendanceRecord.session_date).where(AttendanceRecord.updated_at > start),
+        'rollup_changed_entries': select(AttendanceEntry.record_id).where(AttendanceEntry.updated_at > start),
+    }
+
+
+def table_scans(statement) -> List[str]:
+    """Return the tables ``statement`` would read with a full table scan."""
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    if dialect.name == 'sqlite':
+        rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).all()
+        return [match.group(1) for match in (_SQLITE_TABLE_SCAN.match(row[3]) for row in rows) if match]
+    if dialect.name == 'postgresql':
+        # Small tables are seq-scanned regardless of indexes; penalise seq
+        # scans so a remaining one means no usable index exists.
+        db.session.execute(text('SET LOCAL enable_seqscan = off'))
+        plan = db.session.execute(text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+        db.session.rollback()
+        return _postgres_seq_scans(plan[0]['Plan'])
+    raise NotImplementedError(f'{dialect.name} sorgu planları desteklenmiyor.')
+
+
+def _postgres_seq_scans(node) -> List[str]:
+    scans = [node['Relation Name']] if node.get('Node Type') == 'Seq Scan' else []
+    for child in node.get('Plans', ()):
+        scans.extend(_postgres_seq_scans(child))
+    return scans
@@ -0,0 +1,156 @@
+"""Substring search index for students, users and courses.
+
+Each searchable model has a side table holding one Turkish case-folded
+document per row, keyed by the entity id:
+
+* SQLite: an FTS5 table with the ``trigram`` tokenizer (``rowid`` = id),
+  queried with ``GLOB '*term*'``, or with ``instr`` for terms shorter
+  than three characters, which the trigram index cannot serve.
+* PostgreSQL: a plain table with a ``pg_trgm`` GIN index, queried with
+  ``LIKE '%term%'``.
+
+Other databases fall back to ``ILIKE`` on the model columns. The side
+tables follow ORM writes through an ``after_flush`` hook; Core bulk
+inserts must call :func:`reindex` themselves.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import bindparam, column, delete, event, func, inspect, insert, or_, select, table, text
+
+from .. import db
+from ..models import Course, Student, User
+from ..replicas import RoutingSession
+
+
+SEARCHABLE: Dict[type, Tuple[str, Tuple[str, ...]]] = {
+    Student: ('search_students', ('full_name', 'student_number')),
+    User: ('search_users', ('full_name', 'email')),
+    Course: ('search_courses', ('name', 'code')),
+}
+
+_GLOB_SPECIAL = re.compile(r'([*?\[])')
+_LIKE_SPECIAL = re.compile(r'([\\%_])')
+
+
+def fold(value: str) -> str:
+    """Lower-case ``value`` with Turkish rules: ``I`` -> ``ı`` and ``İ`` -> ``i``."""
+    return (value or '').replace('I', 'ı').replace('İ', 'i').lower()
+
+
+def document(instance) -> str:
+    _, fields = SEARCHABLE[type(instance)]
+    return '\n'.join(fold(getattr(instance, field) or '') for field in fields)
+
+
+def _key_column(connection) -> str:
+    return 'rowid' if connection.dialect.name == 'sqlite' else 'id'
+
+
+def _search_table(name: str, connection):
+    return table(name, column(_key_column(connection)), column('body'))
+
+
+def create_search_tables() -> List[str]:
+    """Create missing search tables and fill them from the current data; returns their names."""
+    dialect = db.engine.dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        return []
+    inspector = inspect(db.engine)
+    created = []
+    with db.engine.begin() as connection:
+        if dialect == 'postgresql':
+            connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        for model, (name, _) in SEARCHABLE.items():
+            if inspector.has_table(name):
+                continue
+            if dialect == 'sqlite':
+                connection.execute(
+                    text(f"CREATE VIRTUAL TABLE {name} USING fts5(body, tokenize='trigram case_sensitive 1')")
+                )
+            else:
+                connection.execute(text(f'CREATE TABLE {name} (id INTEGER PRIMARY KEY, body TEXT NOT NULL)'))
+                connection.execute(text(f'CREATE INDEX ix_{name}_body ON {name} USING gin (body gin_trgm_ops)'))
+            _rebuild(connection, model)
+            created.append(name)
+    return created
+
+
+def rebuild_search_index() -> int:
+    """Re-create every search document from the model tables; returns the document count."""
+    create_search_tables()
+    with db.engine.begin() as connection:
+        return sum(_rebuild(connection, model) for model in SEARCHABLE)
+
+
+def reindex(model, ids: Iterable[int]) -> None:
+    """Refresh the documents of ``ids`` inside the current transaction (for Core bulk writes)."""
+    ids = list(ids)
+    if ids:
+        instances = db.session.scalars(select(model).where(model.id.in_(ids))).all()
+        _write(db.session.connection(), model, {instance.id: document(instance) for instance in instances})
+
+
+def search_ids(model, query: str):
+    """Return a SELECT of the ids of ``model`` rows whose fields contain ``query``."""
+    name, fields = SEARCHABLE[model]
+    term = fold(query.strip())
+    dialect = db.session.get_bind(clause=select(model.id)).dialect.name
+    if dialect == 'sqlite':
+        search_table = table(name, column('rowid'), column('body'))
+        if len(term) < 3:
+            # SQLite sizes GLOB terms in bytes, so e.g. 'öz' would be looked
+            # up as a trigram and miss; short terms scan the documents instead.
+            return select(search_table.c.rowid).where(func.instr(search_table.c.body, term) > 0)
+        pattern = '*' + _GLOB_SPECIAL.sub(r'[\1]', term) + '*'
+        return select(search_table.c.rowid).where(search_table.c.body.op('GLOB')(pattern))
+    if dialect == 'postgresql':
+        search_table = table(name, column('id'), column('body'))
+        pattern = '%' + _LIKE_SPECIAL.sub(r'\\\1', term) + '%'
+        return select(search_table.c.id).where(search_table.c.body.like(pattern, escape='\\'))
+    like = f'%{query.strip()}%'
+    return select(model.id).where(or_(*(getattr(model, field).ilike(like) for field in fields)))
+
+
+def _rebuild(connection, model) -> int:
+    name, fields = SEARCHABLE[model]
+    connection.execute(delete(_search_table(name, connection)))
+    rows = connection.execute(select(model.id, *(getattr(model, field) for field in fields))).all()
+    documents = {row[0]: '\n'.join(fold(value or '') for value in row[1:]) for row in rows}
+    _write(connection, model, documents, replace=False)
+    return len(documents)
+
+
+def _write(connection, model, documents: Dict[int, str], replace: bool = True, deleted: Iterable[int] = ()) -> None:
+    name, _ = SEARCHABLE[model]
+    search_table = _search_table(name, connection)
+    key = search_table.c[_key_column(connection)]
+    stale = list(documents) + list(deleted) if replace else []
+    if stale:
+        connection.execute(delete(search_table).where(key.in_(stale)))
+    if documents:
+        connection.execute(
+            insert(search_table).values({key.name: bindparam('b_id'), 'body': bindparam('b_body')}),
+            [{'b_id': entity_id, 'b_body': body} for entity_id, body in documents.items()],
+        )
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _sync_search_index(session, flush_context):
+    changed: Dict[type, Dict[int, str]] = {}
+    removed: Dict[type, List[int]] = {}
+    for instance in list(session.new) + list(session.dirty):
+        if type(instance) in SEARCHABLE and instance.id is not None:
+            changed.setdefault(type(instance), {})[instance.id] = document(instance)
+    for instance in session.deleted:
+        if type(instance) in SEARCHABLE:
+            removed.setdefault(type(instance), []).append(instance.id)
+    if not changed and not removed:
+        return
+    connection = session.connection()
+    if connection.dialect.name not in ('sqlite', 'postgresql'):
+        return
+    for model in set(changed) | set(removed):
+        _write(connection, model, changed.get(model, {}), deleted=removed.get(model, ()))
@@ -0,0 +1,117 @@
+"""Submissions per second of the teacher attendance form, bulk versus per-entry writes.
+
+Posts ``--submissions`` roll calls of ``--students`` students to
+``/teacher/yoklama/olustur`` through the Flask test client, once per
+``--modes`` entry:
+
+* ``bulk``: the current path (``_write_attendance``, one executemany INSERT).
+* ``orm``: the previous path, one ``db.session.add`` per entry, swapped in
+  for comparison.
+
+SQLite runs use a fresh temporary database per mode; pass ``--database-url``
+to benchmark another server (its data is not cleaned up). Parallel writers
+are measured by ``benchmarks/concurrent_writes.py``.
+
+    python benchmarks/attendance_submissions.py
+    python benchmarks/attendance_submissions.py --database-url postgresql://...
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = 'bench'
+
+
+def _write_attendance_orm(teacher_id, course_id, classroom_id, statuses, session_date=None):
+    from app import db
+    from app.models import AttendanceEntry, AttendanceRecord
+    from app.utils.counters import apply_deltas, new_deltas, track_status
+
+    record = AttendanceRecord(course_id=course_id, classroom_id=classroom_id, teacher_id=teacher_id)
+    db.session.add(record)
+    db.session.flush()
+    deltas = new_deltas()
+    for student_id, status in statuses.items():
+        db.session.add(AttendanceEntry(record_id=record.id, student_id=student_id, status=status))
+        track_status(deltas, student_id, course_id, status)
+    apply_deltas(deltas)
+    return record
+
+
+def _seed(db, students):
+    from werkzeug.security import generate_password_hash
+
+    from app.models import ClassRoom, Course, Student, User
+
+    suffix = os.urandom(4).hex()
+    teacher = User(
+        full_name='Bench',
+        email=f'bench-{suffix}@okul',
+        role='teacher',
+        password_hash=generate_password_hash(PASSWORD),
+    )
+    classroom = ClassRoom(name=f'BENCH-{suffix}')
+    course = Course(name='Bench', code=f'BENCH-{suffix}', classrooms=[classroom], teachers=[teacher])
+    teacher.teacher_classes = [classroom]
+    db.session.add_all([teacher, classroom, course])
+    db.session.flush()
+    pupils = [
+        Student(full_name=f'Bench {i}', student_number=f'{suffix}-{i}', classroom=classroom, courses=[course])
+        for i in range(students)
+    ]
+    db.session.add_all(pupils)
+    db.session.commit()
+    form = {'course_id': course.id, 'class_id': classroom.id}
+    form.update({f'status_{pupil.id}': ('present', 'absent', 'excused')[pupil.id % 3] for pupil in pupils})
+    return teacher.email, form
+
+
+def run(database_url, mode, submissions, students):
+    os.environ['DATABASE_URL'] = database_url
+    from app import create_app, db
+    from app.routes import teacher
+
+    app = create_app()
+    write = teacher._write_attendance
+    if mode == 'orm':
+        teacher._write_attendance = _write_attendance_orm
+    try:
+        with app.app_context():
+            email, form = _seed(db, students)
+        client = app.test_client()
+        client.post('/auth/login', data={'email': email, 'password': PASSWORD})
+        began = time.perf_counter()
+        for _ in range(submissions):
+            response = client.post('/teacher/yoklama/olustur', data=form)
+            assert response.status_code == 302, response.status_code
+        elapsed = time.perf_counter() - began
+        with app.app_context():
+            db.engine.dispose()
+    finally:
+        teacher._write_attendance = write
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', choices=['orm', 'bulk'], default=['orm', 'bulk'])
+    parser.add_argument('--database-url')
+    parser.add_argument('--submissions', type=int, default=300)
+    parser.add_argument('--students', type=int, default=30, help='students per roll call')
+    args = parser.parse_args()
+
+    print(f'{args.submissions} yoklama x {args.students} öğrenci')
+    print(f"{'yol':<8}{'süre (s)':>12}{'yoklama/s':>12}")
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory() as directory:
+            database_url = args.database_url or f'sqlite:///{os.path.join(directory, "bench.db")}'
+            elapsed = run(database_url, mode, args.submissions, args.students)
+        print(f'{mode:<8}{elapsed:>12.2f}{args.submissions / elapsed:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
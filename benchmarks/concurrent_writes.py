@@ -0,0 +1,120 @@
+"""Write throughput of parallel attendance submissions for each engine profile.
+
+Every worker process builds its own app (as a WSGI worker would) and saves
+``--sessions`` roll calls of ``--students`` students through the same code
+path as the teacher form. SQLite runs use a fresh temporary database per
+profile; pass ``--database-url`` to benchmark another server (its data is
+not cleaned up).
+
+    python benchmarks/concurrent_writes.py --profiles none sqlite
+    python benchmarks/concurrent_writes.py --database-url postgresql://... --profiles none postgresql
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _configure(database_url, profile):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['DATABASE_PROFILE'] = profile
+
+
+def _seed(students):
+    from app import create_app, db
+    from app.models import ClassRoom, Course, Student, User
+
+    app = create_app()
+    with app.app_context():
+        suffix = os.urandom(4).hex()
+        teacher = User(full_name='Bench', email=f'bench-{suffix}@okul', role='teacher', password_hash='-')
+        classroom = ClassRoom(name=f'BENCH-{suffix}')
+        course = Course(name='Bench', code=f'BENCH-{suffix}', classrooms=[classroom], teachers=[teacher])
+        db.session.add_all([teacher, classroom, course])
+        db.session.flush()
+        db.session.add_all(
+            Student(full_name=f'Bench {i}', student_number=f'{suffix}-{i}', classroom=classroom, courses=[course])
+            for i in range(students)
+        )
+        db.session.commit()
+        ids = teacher.id, course.id, classroom.id
+        db.engine.dispose()
+    return ids
+
+
+def _worker(database_url, profile, ids, sessions, start, results):
+    _configure(database_url, profile)
+    from sqlalchemy import select
+    from sqlalchemy.exc import OperationalError
+
+    from app import create_app, db
+    from app.models import Student
+    from app.routes.teacher import _write_attendance
+
+    teacher_id, course_id, classroom_id = ids
+    app = create_app()
+    with app.app_context():
+        student_ids = db.session.scalars(select(Student.id).where(Student.classroom_id == classroom_id)).all()
+        statuses = {student_id: ('present', 'absent', 'excused')[student_id % 3] for student_id in student_ids}
+        db.session.rollback()
+        start.wait()
+        written = failed = 0
+        began = time.perf_counter()
+        for _ in range(sessions):
+            try:
+                _write_attendance(teacher_id, course_id, classroom_id, statuses)
+                db.session.commit()
+                written += 1
+            except OperationalError:
+                db.session.rollback()
+                failed += 1
+        results.put((written, failed, time.perf_counter() - began))
+
+
+def run(database_url, profile, workers, sessions, students):
+    _configure(database_url, profile)
+    ids = _seed(students)
+    start = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_worker, args=(database_url, profile, ids, sessions, start, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    time.sleep(1)  # let every worker finish create_app before the clock starts
+    began = time.perf_counter()
+    start.set()
+    outcomes = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - began
+    for process in processes:
+        process.join()
+    written = sum(outcome[0] for outcome in outcomes)
+    failed = sum(outcome[1] for outcome in outcomes)
+    return written, failed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', default=['none', 'sqlite'])
+    parser.add_argument('--database-url')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--sessions', type=int, default=50, help='roll calls per worker')
+    parser.add_argument('--students', type=int, default=30, help='students per roll call')
+    args = parser.parse_args()
+
+    print(f'{args.workers} işlem x {args.sessions} yoklama x {args.students} öğrenci')
+    print(f"{'profil':<12}{'yazılan':>10}{'hata':>8}{'süre (s)':>12}{'yoklama/s':>12}")
+    for profile in args.profiles:
+        with tempfile.TemporaryDirectory() as directory:
+            database_url = args.database_url or f'sqlite:///{os.path.join(directory, "bench.db")}'
+            written, failed, elapsed = run(database_url, profile, args.workers, args.sessions, args.students)
+        print(f'{profile:<12}{written:>10}{failed:>8}{elapsed:>12.2f}{written / elapsed:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Time and peak memory of parsing a student Excel upload, pandas versus openpyxl.
+
+Writes a 4-column sheet (ad, soyad, okul_numarasi, sinif) of each
+``--rows`` size and parses it once per ``--modes`` entry, each in a fresh
+process so the peak RSS belongs to that mode alone (it includes the
+pandas import in every case):
+
+* ``pandas``: ``pd.read_excel`` into a list, the previous import path and
+  still the fallback for legacy ``.xls`` files.
+* ``list``: ``parse_excel``, openpyxl read-only mode collected into a list.
+* ``stream``: ``iter_excel`` consumed row by row, as the import route does.
+
+    python benchmarks/excel_import.py --rows 10000 100000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ['pandas', 'list', 'stream']
+
+
+def _write_sheet(path, rows):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(['ad', 'soyad', 'okul_numarasi', 'sinif'])
+    for i in range(rows):
+        sheet.append([f'Öğrenci{i}', 'Yılmaz', 100000 + i, f'{9 + i % 4}-{"ABC"[i % 3]}'])
+    workbook.save(path)
+
+
+def _parse(path, mode):
+    from werkzeug.datastructures import FileStorage
+
+    from app.utils import importers
+
+    with open(path, 'rb') as handle:
+        upload = FileStorage(stream=handle, filename='ogrenciler.xlsx')
+        began = time.perf_counter()
+        if mode == 'pandas':
+            count = len(list(importers._iter_excel_pandas(upload.read())))
+        elif mode == 'list':
+            count = len(importers.parse_excel(upload))
+        else:
+            count = sum(1 for _ in importers.iter_excel(upload))
+        elapsed = time.perf_counter() - began
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return count, elapsed, peak_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    print(f"{'satır':>8}  {'yol':<8}{'süre (s)':>10}{'tepe RSS (MB)':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            path = os.path.join(directory, f'ogrenciler-{rows}.xlsx')
+            _write_sheet(path, rows)
+            for mode in args.modes:
+                with context.Pool(1) as pool:
+                    count, elapsed, peak_mb = pool.apply(_parse, (path, mode))
+                assert count == rows, count
+                print(f'{rows:>8}  {mode:<8}{elapsed:>10.2f}{peak_mb:>15.0f}')
+
+
+if __name__ == '__main__':
+    main()
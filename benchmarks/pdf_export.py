@@ -0,0 +1,67 @@
+"""Serial versus chunked parallel rendering of the attendance PDF export.
+
+Builds ``--records`` in-memory roll calls of ``--students`` students (no
+database needed) and renders them with ``generate_pdf`` once per value of
+``--workers``; ``0`` is the serial path. Both paths render the same
+chunks, so their page counts match.
+
+    python benchmarks/pdf_export.py --records 2000 --workers 0 2 4
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pypdfium2 as pdfium  # noqa: E402
+
+from app.utils.exporters import generate_pdf  # noqa: E402
+
+
+def _records(count, students):
+    teacher = SimpleNamespace(full_name='Ayşe Yılmaz')
+    courses = [SimpleNamespace(name=f'Ders {number}', code=f'D{number}') for number in range(8)]
+    classrooms = [SimpleNamespace(name=f'{grade}-{branch}') for grade in (9, 10, 11, 12) for branch in 'ABC']
+    pupils = [SimpleNamespace(full_name=f'Öğrenci {number:04d}') for number in range(students)]
+    start = datetime(2024, 9, 9, 8, 40)
+    return [
+        SimpleNamespace(
+            course=courses[number % len(courses)],
+            classroom=classrooms[number % len(classrooms)],
+            teacher=teacher,
+            session_date=start + timedelta(hours=number),
+            entries=[
+                SimpleNamespace(student=pupil, status=('present', 'present', 'absent', 'excused')[(number + index) % 4])
+                for index, pupil in enumerate(pupils)
+            ],
+        )
+        for number in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=2000)
+    parser.add_argument('--students', type=int, default=30, help='students per roll call')
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, os.cpu_count() or 1])
+    parser.add_argument('--chunk-size', type=int, default=200)
+    args = parser.parse_args()
+
+    records = _records(args.records, args.students)
+    print(f'{args.records} yoklama x {args.students} öğrenci, {os.cpu_count()} CPU')
+    print(f"{'işlem':>6}{'sayfa':>8}{'süre (s)':>12}{'hızlanma':>10}")
+    baseline = None
+    for workers in args.workers:
+        began = time.perf_counter()
+        buffer = generate_pdf(records, workers=workers, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - began
+        pages = len(pdfium.PdfDocument(buffer.getvalue()))
+        baseline = baseline or elapsed
+        print(f'{workers:>6}{pages:>8}{elapsed:>12.2f}{baseline / elapsed:>9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
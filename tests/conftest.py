@@ -0,0 +1,126 @@
+from contextlib import contextmanager
+
+import pytest
+from flask import g
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models import AttendanceEntry, AttendanceRecord, ClassRoom, Course, Student, User
+
+
+PASSWORD = 'parola'
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+    app = create_app()
+    app.config.update(TESTING=True)
+
+    @app.before_request
+    def reset_request_globals():
+        # Requests reuse the fixture's app context, so ``g`` (and the user
+        # Flask-Login caches in it) would leak from one client to the next.
+        for name in list(g):
+            g.pop(name)
+
+    with app.app_context():
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def school(app):
+    """A teacher with one course, one classroom and five students."""
+    password_hash = generate_password_hash(PASSWORD, method='pbkdf2:sha256:1000')
+    supervisor = User(full_name='Yönetici', email='yonetici@okul', role='supervisor')
+    teacher = User(full_name='Öğretmen', email='ogretmen@okul', role='teacher')
+    supervisor.password_hash = teacher.password_hash = password_hash
+    classroom = ClassRoom(name='9-A')
+    course = Course(name='Matematik', code='MAT9', classrooms=[classroom], teachers=[teacher])
+    teacher.teacher_classes = [classroom]
+    students = [
+        Student(full_name=f'Öğrenci {i}', student_number=str(100 + i), classroom=classroom, courses=[course])
+        for i in range(5)
+    ]
+    db.session.add_all([supervisor, teacher, classroom, course, *students])
+    db.session.commit()
+    return {
+        'supervisor': supervisor,
+        'teacher': teacher,
+        'classroom': classroom,
+        'course': course,
+        'students': students,
+    }
+
+
+@pytest.fixture
+def add_records(school):
+    """Create ``count`` roll calls of the whole classroom; returns their ids."""
+
+    def add(count):
+        records = [
+            AttendanceRecord(course=school['course'], classroom=school['classroom'], teacher=school['teacher'])
+            for _ in range(count)
+        ]
+        db.session.add_all(records)
+        db.session.flush()
+        db.session.add_all(
+            AttendanceEntry(record_id=record.id, student_id=student.id, status='present')
+            for record in records
+            for student in school['students']
+        )
+        db.session.commit()
+        return [record.id for record in records]
+
+    return add
+
+
+@pytest.fixture
+def login(client):
+    def log_in(user):
+        response = client.post('/auth/login', data={'email': user.email, 'password': PASSWORD})
+        assert response.status_code == 302
+
+    return log_in
+
+
+@pytest.fixture
+def client_for(app):
+    """Return a new test client logged in as ``user``."""
+
+    def make(user):
+        client = app.test_client()
+        response = client.post('/auth/login', data={'email': user.email, 'password': PASSWORD})
+        assert response.status_code == 302
+        return client
+
+    return make
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager collecting every SQL statement sent to the primary engine."""
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+    return counter
@@ -0,0 +1,41 @@
+from app import db
+from app.models import User
+from app.utils.accounts import StudentEmailAllocator
+
+
+def _add_users(*emails):
+    db.session.add_all(User(full_name='x', email=email, role='student', password_hash='x') for email in emails)
+    db.session.commit()
+
+
+def test_preload_fetches_only_the_batch_bases_in_one_query(app, count_queries):
+    _add_users(
+        'ali.5@ogrenci.okul',
+        'ali.5-1@ogrenci.okul',
+        'ali.5-3@ogrenci.okul',
+        'ali.50@ogrenci.okul',
+        'veli.6@ogrenci.okul',
+        'ayse.7@okul',
+    )
+    allocator = StudentEmailAllocator()
+
+    with count_queries() as statements:
+        allocator.preload(['ali.5', 'ayse.7', 'can.8'])
+        emails = [allocator.allocate('Ali', '5') for _ in range(3)]
+        emails += [allocator.allocate('Ayşe', '7'), allocator.allocate('Can', '8')]
+
+    assert len(statements) == 1
+    assert emails == [
+        'ali.5-2@ogrenci.okul',
+        'ali.5-4@ogrenci.okul',
+        'ali.5-5@ogrenci.okul',
+        'ayse.7@ogrenci.okul',
+        'can.8@ogrenci.okul',
+    ]
+
+
+def test_allocate_loads_an_unseen_base(app):
+    _add_users('ali.5@ogrenci.okul')
+    allocator = StudentEmailAllocator()
+
+    assert allocator.allocate('Ali', '5') == 'ali.5-1@ogrenci.okul'
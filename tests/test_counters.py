@@ -0,0 +1,108 @@
+"""attendance_counters must always equal the aggregate of the raw entries."""
+import pytest
+
+from app import db
+from app.models import AttendanceCounter, AttendanceEntry, AttendanceRecord, Student
+from app.utils.counters import verify_counters
+
+
+@pytest.fixture
+def teacher_client(school, login, client):
+    login(school['teacher'])
+    return client
+
+
+def _take_roll_call(client, school, statuses):
+    form = {'course_id': school['course'].id, 'class_id': school['classroom'].id}
+    form.update({f'status_{student.id}': status for student, status in zip(school['students'], statuses)})
+    response = client.post('/teacher/yoklama/olustur', data=form)
+    assert response.status_code == 302
+    return AttendanceRecord.query.order_by(AttendanceRecord.id.desc()).first()
+
+
+def _counter(student, course):
+    return db.session.get(AttendanceCounter, (student.id, course.id))
+
+
+def test_teacher_create_and_edit_keep_counters_exact(school, teacher_client):
+    record = _take_roll_call(teacher_client, school, ['absent', 'excused', 'present'])
+    assert verify_counters() == []
+    assert _counter(school['students'][0], school['course']).absent == 1
+
+    entries = {entry.student_id: entry.id for entry in record.entries}
+    first, second = school['students'][:2]
+    response = teacher_client.post(
+        f'/teacher/yoklama/{record.id}/duzenle',
+        data={f'status_{entries[first.id]}': 'present', f'status_{entries[second.id]}': 'absent'},
+    )
+    assert response.status_code == 302
+    assert verify_counters() == []
+    assert _counter(first, school['course']).absent == 0
+    assert _counter(second, school['course']).absent == 1
+
+
+def test_supervisor_edit_keeps_counters_exact(school, teacher_client, client_for):
+    record = _take_roll_call(teacher_client, school, ['absent'])
+    entry = next(entry for entry in record.entries if entry.student_id == school['students'][0].id)
+
+    response = client_for(school['supervisor']).post(
+        f'/supervisor/yoklamalar/{record.id}/duzenle', data={f'status_{entry.id}': 'excused'}
+    )
+
+    assert response.status_code == 302
+    assert verify_counters() == []
+    assert _counter(school['students'][0], school['course']).excused == 1
+
+
+def test_sync_keeps_counters_exact(school, teacher_client):
+    sessions = [
+        {
+            'idempotency_key': f'k{number}',
+            'course_id': school['course'].id,
+            'class_id': school['classroom'].id,
+            'statuses': {str(school['students'][0].id): 'absent'},
+        }
+        for number in range(3)
+    ]
+    response = teacher_client.post('/teacher/api/yoklama/senkron', json={'sessions': sessions + sessions[:1]})
+
+    assert response.status_code == 200
+    assert verify_counters() == []
+    assert _counter(school['students'][0], school['course']).absent == 3
+
+
+def test_deleting_a_student_keeps_counters_exact(school, teacher_client, client_for):
+    _take_roll_call(teacher_client, school, ['absent', 'absent'])
+    student_id = school['students'][0].id
+
+    response = client_for(school['supervisor']).post(f'/supervisor/ogrenciler/{student_id}/sil')
+
+    assert response.status_code == 302
+    assert db.session.get(Student, student_id) is None
+    assert verify_counters() == []
+
+
+def test_deleting_a_record_keeps_counters_exact(school, teacher_client):
+    _take_roll_call(teacher_client, school, ['absent'])
+    record = _take_roll_call(teacher_client, school, ['absent'])
+
+    db.session.delete(record)
+    db.session.commit()
+
+    assert AttendanceEntry.query.filter_by(record_id=record.id).count() == 0
+    assert verify_counters() == []
+    assert _counter(school['students'][0], school['course']).absent == 1
+
+
+def test_rebuild_counters_command_repairs_drift(app, school, teacher_client):
+    _take_roll_call(teacher_client, school, ['absent', 'excused'])
+    counter = _counter(school['students'][0], school['course'])
+    counter.absent += 5
+    counter.total += 5
+    db.session.commit()
+    assert verify_counters() != []
+
+    result = app.test_cli_runner().invoke(args=['rebuild-counters'])
+
+    assert result.exit_code == 0, result.output
+    assert verify_counters() == []
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pypdfium2 as pdfium
+
+from app.utils.exporters import generate_pdf
+
+
+def _records(count, students):
+    teacher = SimpleNamespace(full_name='Ayşe Yılmaz')
+    course = SimpleNamespace(name='Matematik', code='MAT9')
+    classroom = SimpleNamespace(name='9-A')
+    pupils = [SimpleNamespace(full_name=f'Öğrenci {i}') for i in range(students)]
+    return [
+        SimpleNamespace(
+            course=course,
+            classroom=classroom,
+            teacher=teacher,
+            session_date=datetime(2024, 9, 9, 8, 40) + timedelta(hours=number),
+            entries=[
+                SimpleNamespace(student=pupil, status=('present', 'absent', 'excused')[(number + i) % 3])
+                for i, pupil in enumerate(pupils)
+            ],
+        )
+        for number in range(count)
+    ]
+
+
+def _page_texts(buffer):
+    document = pdfium.PdfDocument(buffer.getvalue())
+    return [page.get_textpage().get_text_range() for page in document]
+
+
+def test_parallel_pdf_matches_serial_page_for_page():
+    # Chunks of 7 roll calls of 12 students end mid-page, so a chunk boundary
+    # that the serial path ignored would shift every following page.
+    records = _records(30, 12)
+
+    serial = _page_texts(generate_pdf(records, workers=0, chunk_size=7))
+    parallel = _page_texts(generate_pdf(records, workers=2, chunk_size=7))
+
+    assert len(serial) == len(parallel)
+    assert serial == parallel
+    assert 'Öğrenci 11' in serial[-1]
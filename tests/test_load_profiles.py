@@ -0,0 +1,61 @@
+"""Query budgets of the attendance record loader profiles and the teacher history page."""
+import pytest
+
+from app import db
+from app.models import AttendanceRecord, attendance_record_options
+
+
+def _touch_headers(record):
+    return record.course.name, record.classroom.name, record.teacher.full_name
+
+
+def _touch_entries(record):
+    return [(entry.status, entry.student.full_name) for entry in record.entries]
+
+
+@pytest.mark.parametrize(
+    ('profile', 'touch', 'max_queries'),
+    [
+        ('list', _touch_headers, 1),
+        ('export', lambda record: (_touch_headers(record), _touch_entries(record)), 2),
+    ],
+)
+def test_record_list_profiles_do_not_query_per_record(add_records, count_queries, profile, touch, max_queries):
+    add_records(20)
+    db.session.expunge_all()
+
+    with count_queries() as statements:
+        records = AttendanceRecord.query.options(*attendance_record_options(profile)).all()
+        for record in records:
+            touch(record)
+
+    assert len(records) == 20
+    assert len(statements) <= max_queries
+
+
+def test_edit_profile_loads_one_record_with_students(add_records, count_queries):
+    record_id = add_records(1)[0]
+    db.session.expunge_all()
+
+    with count_queries() as statements:
+        record = db.session.get(AttendanceRecord, record_id, options=attendance_record_options('edit'))
+        _touch_headers(record)
+        _touch_entries(record)
+
+    assert len(record.entries) == 5
+    assert len(statements) <= 2
+
+
+def test_teacher_history_query_count_does_not_grow_with_records(school, add_records, login, client, count_queries):
+    login(school['teacher'])
+    client.get('/teacher/yoklama/gecmis')  # fills the user cache
+    counts = []
+    for record_count in (3, 30):
+        add_records(record_count)
+        with count_queries() as statements:
+            response = client.get('/teacher/yoklama/gecmis')
+        assert response.status_code == 200
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+    assert counts[1] <= 3, counts
@@ -0,0 +1,26 @@
+"""Hot attendance queries must be answered from indexes, never with a full table scan."""
+from app.utils.schema import hot_queries, table_scans
+
+
+def test_hot_queries_use_indexes(app):
+    scans = {name: table_scans(statement) for name, statement in hot_queries().items()}
+
+    assert {name: tables for name, tables in scans.items() if tables} == {}
+
+
+def test_check_query_plans_command_passes(app):
+    result = app.test_cli_runner().invoke(args=['check-query-plans'])
+
+    assert result.exit_code == 0, result.output
+
+
+def test_check_query_plans_reports_unsupported_dialect(app, monkeypatch):
+    def unsupported(statement):
+        raise NotImplementedError('mysql sorgu planları desteklenmiyor.')
+
+    monkeypatch.setattr('app.cli.table_scans', unsupported)
+    result = app.test_cli_runner().invoke(args=['check-query-plans'])
+
+    assert result.exit_code == 1
+    assert 'mysql sorgu planları desteklenmiyor.' in result.output
+    assert result.exception is None or isinstance(result.exception, SystemExit)
@@ -0,0 +1,52 @@
+import pytest
+
+from app import db
+from app.models import ClassRoom, Student
+from app.utils.search import search_ids
+
+
+@pytest.fixture
+def students(app):
+    classroom = ClassRoom(name='10-B')
+    names = ['Ali Öz', 'Işıl IŞIK', 'İlker Işık', 'Irmak Demir', 'Mehmet Kaya']
+    db.session.add_all(
+        Student(full_name=name, student_number=str(200 + i), classroom=classroom) for i, name in enumerate(names)
+    )
+    db.session.commit()
+
+
+def _search(query):
+    ids = db.session.scalars(search_ids(Student, query))
+    return sorted(db.session.get(Student, student_id).full_name for student_id in ids)
+
+
+@pytest.mark.parametrize(
+    'query, expected',
+    [
+        ('IŞIK', ['Işıl IŞIK', 'İlker Işık']),
+        ('ışık', ['Işıl IŞIK', 'İlker Işık']),
+        ('İLKER', ['İlker Işık']),
+        ('ilker', ['İlker Işık']),
+        ('IRMAK', ['Irmak Demir']),
+        ('irmak', []),
+    ],
+)
+def test_search_folds_turkish_letters(students, query, expected):
+    assert _search(query) == expected
+
+
+@pytest.mark.parametrize(
+    'query, expected',
+    [
+        ('Öz', ['Ali Öz']),
+        ('öz', ['Ali Öz']),
+        ('şı', ['Işıl IŞIK', 'İlker Işık']),
+        ('ıl', ['Işıl IŞIK']),
+        ('İ', ['Ali Öz', 'Irmak Demir', 'İlker Işık']),
+        ('ö', ['Ali Öz']),
+        ('me', ['Mehmet Kaya']),
+        ('20', ['Ali Öz', 'Irmak Demir', 'Işıl IŞIK', 'Mehmet Kaya', 'İlker Işık']),
+    ],
+)
+def test_search_finds_one_and_two_character_terms(students, query, expected):
+    assert _search(query) == sorted(expected)
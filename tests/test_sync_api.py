@@ -0,0 +1,56 @@
+"""Input validation of the offline attendance sync API."""
+import pytest
+
+from app.models import AttendanceRecord
+
+SYNC_URL = '/teacher/api/yoklama/senkron'
+
+
+@pytest.fixture
+def teacher_client(school, login, client):
+    login(school['teacher'])
+    return client
+
+
+def _session(school, **overrides):
+    item = {
+        'idempotency_key': 'k1',
+        'course_id': school['course'].id,
+        'class_id': school['classroom'].id,
+        'statuses': {str(school['students'][0].id): 'absent'},
+    }
+    item.update(overrides)
+    return item
+
+
+def test_valid_session_is_written(school, teacher_client):
+    response = teacher_client.post(SYNC_URL, json={'sessions': [_session(school)]})
+
+    assert response.status_code == 200
+    [result] = response.get_json()['results']
+    assert result['status'] == 'created'
+    assert AttendanceRecord.query.count() == 1
+
+
+@pytest.mark.parametrize(
+    'overrides',
+    [
+        {'class_id': [1]},
+        {'class_id': {'id': 1}},
+        {'course_id': [1]},
+        {'course_id': True},
+        {'course_id': '1'},
+        {'statuses': {'1': ['x']}},
+        {'statuses': {'1': {'status': 'absent'}}},
+        {'statuses': ['absent']},
+    ],
+)
+def test_unexpected_types_are_rejected_per_session(school, teacher_client, overrides):
+    sessions = [_session(school, idempotency_key='bad', **overrides), _session(school)]
+    response = teacher_client.post(SYNC_URL, json={'sessions': sessions})
+
+    assert response.status_code == 200
+    bad, good = response.get_json()['results']
+    assert bad['status'] == 'error' and bad['error']
+    assert good['status'] == 'created'
+    assert AttendanceRecord.query.count() == 1
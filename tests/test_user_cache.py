@@ -0,0 +1,26 @@
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models import User, load_user
+
+
+def test_adding_a_student_with_an_existing_account_refreshes_the_cached_user(app, school, client_for):
+    account = User(full_name='Eski Ad', email='ayse@ogrenci.okul', role='student')
+    account.password_hash = generate_password_hash('eski', method='pbkdf2:sha256:1000')
+    db.session.add(account)
+    db.session.commit()
+    assert load_user(account.id).full_name == 'Eski Ad'
+
+    response = client_for(school['supervisor']).post(
+        '/supervisor/ogrenciler/ekle',
+        data={
+            'full_name': 'Ayşe Yeni',
+            'student_number': '900',
+            'classroom_id': school['classroom'].id,
+            'email': 'ayse@ogrenci.okul',
+            'password': 'yeni-parola',
+        },
+    )
+
+    assert response.status_code == 302
+    assert load_user(account.id).full_name == 'Ayşe Yeni'